@@ -0,0 +1,235 @@
+"""
+In-process lookups - the same answers as `f76 scrap`, `f76 sources`, ... without starting a process
+or parsing tables.
+
+    from f76 import api
+    api.scrap("Desk fan")                  # [Scrap(component='Steel', quantity=2), ...]
+    for s in api.iter_sources("Lead"):     # streamed, for big result sets
+        print(s.item, s.quantity)
+
+Every function takes optional `db` (a path) and `game` ('fo76', 'fo4', ...) keywords;
+by default they use the same database the CLI would.
+"""
+import datetime, os, pathlib, sqlite3, threading
+from typing import Iterator
+
+from .scripts.db_utils import get_conn
+from .scripts.games import DEFAULT_GAME, Game, get_game
+
+__all__ = [
+    "Scrap", "Source", "Spawn",
+    "scrap", "sources", "iter_sources", "where", "iter_where", "whereis", "places", "iter_places", "regions",
+    "resolve_db_path", "default_data_dir", "iso_utc", "close",
+]
+
+# --- Which database ---
+def default_data_dir() -> pathlib.Path:
+    base = pathlib.Path.home() / ".local" / "share" / "f76"  # fine on mac/Linux
+    # on Windows can use: Path(os.environ.get("APPDATA", "~")) / "f76"
+    return base
+
+def resolve_db_path(db: str | pathlib.Path | None = None, game: str | Game | None = None, *,
+                    active: str | None = None) -> pathlib.Path:
+    """
+    Where a game's database lives: `db` if given, else F76_DB (only for the active game),
+    else data/<file> in a repo checkout, else the user data dir.
+    - `active` is the game F76_DB belongs to - F76_GAME or the default unless the CLI says otherwise
+    """
+    if db:
+        return pathlib.Path(db)
+    active_game = get_game(active or os.environ.get("F76_GAME") or DEFAULT_GAME)
+    game = game if isinstance(game, Game) else get_game(game or active_game.key)
+
+    env = os.environ.get("F76_DB")
+    if env and game.key == active_game.key:
+        return pathlib.Path(env)
+
+    # Repo dev path (works when running in the repo)
+    repo_db = pathlib.Path(__file__).resolve().parents[1] / "data" / game.db_filename
+    if repo_db.exists():
+        return repo_db
+    return default_data_dir() / game.db_filename
+
+# --- Cached connections ---
+# Opening a connection means a file open plus the migration check, so each thread keeps one per database
+# and reuses it. Per thread, because a sqlite3 connection may only be used by the thread that opened it.
+# Docs: https://docs.python.org/3/library/sqlite3.html#sqlite3.threadsafety
+_local = threading.local()
+
+def _conn(db: str | pathlib.Path | None, game: str | Game | None) -> sqlite3.Connection:
+    cache: dict[pathlib.Path, sqlite3.Connection] = _local.__dict__.setdefault("conns", {})
+    path = resolve_db_path(db, game)
+    conn = cache.get(path)
+    if conn is None:
+        conn = cache[path] = get_conn(path)
+    return conn
+
+def close():
+    """Close this thread's cached connections (they're reopened on the next call)"""
+    for conn in _local.__dict__.pop("conns", {}).values():
+        conn.close()
+
+# --- Results ---
+# 🫧 Refresh - __slots__ 🫧
+# A class with __slots__ stores its attributes in fixed slots instead of a per-object __dict__,
+# so each result is about as small as a tuple - it matters when a query returns thousands of them.
+# Docs: https://docs.python.org/3/reference/datamodel.html#slots
+class _Row:
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __iter__(self):
+        # unpacks like the tuple it came from: `for component, qty in api.scrap(...)`
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __hash__(self):
+        # defining __eq__ sets __hash__ to None - hash the values, so equal rows can go in sets and dict keys
+        return hash((type(self).__name__, *self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class Scrap(_Row):
+    __slots__ = ("component", "quantity")
+
+class Source(_Row):
+    __slots__ = ("item", "quantity")
+
+class Spawn(_Row):
+    __slots__ = ("location", "quantity", "description")   # quantity is None when the wiki doesn't say
+
+def _rows(sql: str, params: tuple, db, game, cls=None) -> Iterator:
+    # iterating the cursor pulls rows from SQLite as they're consumed, never the whole result at once
+    cur = _conn(db, game).execute(sql, params)
+    if cls is None:
+        return (value for (value,) in cur)
+    return (cls(*row) for row in cur)
+
+def iso_utc(value: str | datetime.date, *, end_of_day: bool = False) -> str:
+    """
+    Normalize a date/datetime (or ISO string) to the 'YYYY-MM-DDTHH:MM:SSZ' text the ledger stores.
+    A bare date means its start, or its last second with `end_of_day`. Raises ValueError for anything else.
+    """
+    if isinstance(value, str):
+        when = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        bare_date = len(value) == 10
+    elif isinstance(value, datetime.datetime):
+        when, bare_date = value, False
+    else:
+        when, bare_date = datetime.datetime.combine(value, datetime.time()), True
+    if bare_date and end_of_day:
+        when += datetime.timedelta(days=1, seconds=-1)
+    if when.tzinfo is not None:
+        when = when.astimezone(datetime.timezone.utc)
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# --- Lookups ---
+# Each lookup's SQL lives in a module-level *_SQL constant, so scripts/bench_queries.py can time exactly what runs
+SCRAP_SQL = """
+SELECT c.name, s.quantity
+FROM item i
+JOIN item_scraps s ON s.item_id = i.id
+JOIN component   c ON c.id = s.component_id
+WHERE i.name = ? COLLATE NOCASE
+ORDER BY c.name;
+"""
+
+# Each component's newest history row from a generation that had started by the as-of date.
+# The correlated MAX is a seek on scrap_history's (item_id, component_id, run_id) key.
+SCRAP_AS_OF_SQL = """
+SELECT c.name, h.quantity
+FROM item i
+JOIN scrap_history h ON h.item_id = i.id
+JOIN component     c ON c.id = h.component_id
+WHERE i.name = ? COLLATE NOCASE
+  AND h.run_id = (
+    SELECT MAX(h2.run_id) FROM scrap_history h2
+    WHERE h2.item_id = h.item_id AND h2.component_id = h.component_id
+      AND h2.run_id <= (SELECT COALESCE(MAX(id), 0) FROM scrape_run WHERE started_at <= ?))
+  AND h.quantity IS NOT NULL
+ORDER BY c.name;
+"""
+
+SOURCES_SQL = """
+SELECT i.name, s.quantity
+FROM component c
+JOIN item_scraps s ON s.component_id = c.id
+JOIN item        i ON i.id = s.item_id
+WHERE c.name = ? COLLATE NOCASE
+ORDER BY s.quantity DESC, i.name;
+"""
+
+WHEREIS_SQL = """
+SELECT r.name
+FROM region r
+JOIN location l ON l.region_id = r.id
+WHERE l.name = ? COLLATE NOCASE
+"""
+
+PLACES_SQL = """
+SELECT l.name
+FROM location l
+JOIN region r ON l.region_id = r.id
+WHERE r.name = ? COLLATE NOCASE
+ORDER BY l.name
+"""
+
+REGIONS_SQL = """
+SELECT r.name
+FROM region r
+ORDER BY r.name
+"""
+
+WHERE_SQL = """
+SELECT l.name, il.quantity, NULLIF(d.text, '')
+FROM item_locations il
+JOIN item i ON i.id = il.item_id
+JOIN location l ON l.id = il.location_id
+JOIN description d ON d.id = il.description_id
+WHERE i.name = ? COLLATE NOCASE
+ORDER BY l.name, il.quantity IS NULL, COALESCE(il.quantity, 0) DESC;
+"""
+
+def scrap(item: str, *, as_of: str | datetime.date | None = None, db=None, game=None) -> list[Scrap]:
+    """What an item scraps into - or scrapped into on `as_of`, read from the change history"""
+    if as_of is None:
+        return list(_rows(SCRAP_SQL, (item,), db, game, Scrap))
+    return list(_rows(SCRAP_AS_OF_SQL, (item, iso_utc(as_of, end_of_day=True)), db, game, Scrap))
+
+def iter_sources(component: str, *, db=None, game=None) -> Iterator[Source]:
+    """Junk items that scrap into a component, biggest yield first"""
+    return _rows(SOURCES_SQL, (component,), db, game, Source)
+
+def sources(component: str, *, db=None, game=None) -> list[Source]:
+    return list(iter_sources(component, db=db, game=game))
+
+def iter_where(item: str, *, db=None, game=None) -> Iterator[Spawn]:
+    """
+    Known spawn locations for an item. Reads the database only -
+    unlike `f76 where`, it never scrapes the wiki for items with no spawn data yet.
+    """
+    return _rows(WHERE_SQL, (item,), db, game, Spawn)
+
+def where(item: str, *, db=None, game=None) -> list[Spawn]:
+    return list(iter_where(item, db=db, game=game))
+
+def whereis(location: str, *, db=None, game=None) -> list[str]:
+    """Region(s) a location is in - location names aren't unique across regions"""
+    return list(_rows(WHEREIS_SQL, (location,), db, game))
+
+def iter_places(region: str, *, db=None, game=None) -> Iterator[str]:
+    """Locations in a region, by name"""
+    return _rows(PLACES_SQL, (region,), db, game)
+
+def places(region: str, *, db=None, game=None) -> list[str]:
+    return list(iter_places(region, db=db, game=game))
+
+def regions(*, db=None, game=None) -> list[str]:
+    return list(_rows(REGIONS_SQL, (), db, game))
@@ -1,15 +1,23 @@
 import os, pathlib, typer
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
-from .scripts.scrape.junk_items_table import main as scrape_junk_items
-from .scripts.scrape.regions_and_locations import main as scrape_regions_and_locations
-from .scripts.scrape.junk_locations import scrape_item_locations_by_name
-from .scripts.db_utils import fetch_all
+from .scripts.db_utils import fetch_all, get_conn
+from .scripts.name_cache import complete_names
+from .scripts.games import DEFAULT_GAME, GAMES, Game, get_game
+from .scripts import profiling
+from . import api
+from .api import default_data_dir
 from rich import box
+# Note: the scrapers (and the requests/bs4 they pull in) are imported inside the commands that use them.
+# Shell completion re-runs this module on every keypress, and those imports alone cost ~200ms.
 
 app = typer.Typer(help="Fallout 76 Personal Data Assistant")
 console = Console()
 
+# Which dataset commands run against - set once per run by the --game option on `main` below
+state = {"game": DEFAULT_GAME}
+
 PRIMARY_GREEN = "#03e903"
 SECONDARY_GREEN = "#03AF03"
 
@@ -29,68 +37,126 @@ def make_pipboy_table(title: str, width: int = 60) -> Table:
         row_styles=[PRIMARY_GREEN, SECONDARY_GREEN] # alternating row background
     )
 
-def default_data_dir() -> pathlib.Path:
-    base = pathlib.Path.home() / ".local" / "share" / "f76"  # fine on mac/Linux
-    # on Windows can use: Path(os.environ.get("APPDATA", "~")) / "f76"
-    return base
+def active_game() -> Game:
+    return get_game(state["game"])
+
+def resolve_db_path(db_opt: str | None = None, game: Game | None = None) -> pathlib.Path:
+    # --db flag, then F76_DB (for the --game in use), then the repo's data/ dir, then the user data dir
+    return api.resolve_db_path(db_opt, game or active_game(), active=state["game"])
+
+@app.callback()
+def main(ctx: typer.Context,
+         game: str = typer.Option(DEFAULT_GAME, "--game", "-g", envvar="F76_GAME",
+                                  help=f"Dataset to use: {', '.join(GAMES)}"),
+         profile: bool = typer.Option(False, "--profile", help="Report stage timings, bytes, rows, SQL and peak memory (or set F76_TRACE=1)"),
+         profile_out: pathlib.Path | None = typer.Option(None, help="Also dump cProfile stats for the whole command to this file"),
+         trace_out: pathlib.Path | None = typer.Option(None, help="Also write a Chrome trace (JSON) to this file")):
+    """
+    Fallout 76 Personal Data Assistant
+    """
+    try:
+        state["game"] = get_game(game).key
+    except KeyError as e:
+        raise typer.BadParameter(str(e.args[0]), param_hint="--game")
+
+    # F76_TRACE=1 turns on the report; F76_TRACE=<file>.json also writes a Chrome trace there
+    env_trace = os.environ.get("F76_TRACE", "")
+    if env_trace and env_trace.lower() not in ("0", "false", "no"):
+        profile = True
+        if env_trace.lower().endswith(".json") and trace_out is None:
+            trace_out = pathlib.Path(env_trace)
+    if profile or profile_out or trace_out:
+        _start_profiling(ctx, profile_out, trace_out)
 
-def resolve_db_path(db_opt: str | None = None) -> pathlib.Path:
-    # CLI flag
-    if db_opt:
-        return pathlib.Path(db_opt)
+def _start_profiling(ctx: typer.Context, profile_out: pathlib.Path | None, trace_out: pathlib.Path | None):
+    import cProfile
+    from contextlib import ExitStack
+    profiling.enable(trace_out)
+    # time every console.print as "render" - patched on this instance only, and only while profiling
+    plain_print = console.print
+    def traced_print(*args, **kwargs):
+        with profiling.stage("render"):
+            plain_print(*args, **kwargs)
+    console.print = traced_print
 
-    # env var
-    env = os.environ.get("F76_DB")
-    if env:
-        return pathlib.Path(env)
+    stack = ExitStack()
+    stack.enter_context(profiling.stage(f"command: {ctx.invoked_subcommand}"))
+    profiler = cProfile.Profile() if profile_out else None
+    if profiler:
+        profiler.enable()
 
-    # Repo dev path (works when running in the repo)
-    repo_db = pathlib.Path(__file__).resolve().parents[1] / "data" / "fallout.sqlite"
-    if repo_db.exists():
-        return repo_db
+    # call_on_close runs after the command finishes (or fails), once the Typer context is torn down
+    def finish():
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_out)
+        stack.close()
+        profiling.write_chrome_trace()
+        profiling.report(Console(stderr=True))
+    ctx.call_on_close(finish)
 
-    # user data dir fallback
-    return default_data_dir() / "fallout.sqlite"
+# --- Shell completion ---
+# Completers read the sorted name cache the scrapers write next to the DB (see name_cache.py),
+# not SQLite - apart from building that cache once for a DB that has none. Enable with `f76 --install-completion`.
+def _completer(kind: str):
+    def complete(ctx: typer.Context, incomplete: str) -> list[str]:
+        game = GAMES.get(ctx.parent.params.get("game") if ctx.parent else None, GAMES[DEFAULT_GAME])
+        names = complete_names(resolve_db_path(ctx.params.get("db"), game), kind, incomplete)
+        # The lookup ignores case, but the shell keeps only completions that start with exactly what was typed
+        # ("des" would drop "Desk fan") - so hand names back with the typed prefix (commands ignore case anyway)
+        n = len(incomplete)
+        return [incomplete + name[n:] if name[:n].casefold() == incomplete.casefold() else name for name in names]
+    return complete
+
+complete_item = _completer("item")
+complete_component = _completer("component")
+complete_location = _completer("location")
+complete_region = _completer("region")
+complete_recipe = _completer("recipe")
+
+def _history_bound(value: str, param: str, *, end_of_day: bool) -> str:
+    """
+    Turn a --as-of/--since value into the ISO-8601 UTC text scrape_run.started_at uses.
+    A bare date means the end of that day for --as-of and its start for --since.
+    """
+    try:
+        return api.iso_utc(value, end_of_day=end_of_day)
+    except ValueError:
+        raise typer.BadParameter(f"expected a date like 2025-01-31 or 2025-01-31T12:00, got {value!r}", param_hint=param)
+
+# --- Commands ---
+# The plain lookups (scrap, sources, where, whereis, places, regions) are thin wrappers over f76.api.
+# The rest keep their SQL in a module-level *_SQL constant just above the command,
+# so scripts/bench_queries.py can time exactly what the CLI runs
 
 @app.command("scrap")
-def scrap(item: str, db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+def scrap(item: str = typer.Argument(..., autocompletion=complete_item), db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+          as_of: str | None = typer.Option(None, "--as-of", help="Show the recipe as it was on this date (YYYY-MM-DD, UTC)")):
     """
     Look up what components a Junk Item will scrap into (example: `f76 scrap 'Giddyup Buttercup'`)
     """
-    q = """
-    SELECT c.name, s.quantity
-    FROM item i
-    JOIN item_scraps s ON s.item_id = i.id
-    JOIN component   c ON c.id = s.component_id
-    WHERE i.name = ? COLLATE NOCASE
-    ORDER BY c.name;
-    """
+    # as_of stays as typed for the messages below; the query gets the normalized timestamp
+    as_of_bound = _history_bound(as_of, "--as-of", end_of_day=True) if as_of is not None else None
     db_path = resolve_db_path(db)
-    rows, _ = fetch_all(db_path, q, (item,))
+    rows = api.scrap(item, as_of=as_of_bound, db=db_path)
     if not rows:
-        console.print(f"[bold]No scraps found for:[/bold] {item} (DB: {db_path})")
+        when = f" as of {as_of}" if as_of else ""
+        console.print(f"[bold]No scraps found for:[/bold] {item}{when} (DB: {db_path})")
         raise typer.Exit(1)
-    t = make_pipboy_table(f'"{item}" scraps for:')
+    title = f'"{item}" scraps for:' if as_of is None else f'"{item}" scrapped for (as of {as_of}):'
+    t = make_pipboy_table(title)
     t.add_column(f"{item.title()} components", no_wrap=True); t.add_column("Qty", justify="right", no_wrap=True)
     for comp, qty in rows:
         t.add_row(comp, str(qty))
     console.print(t)
 
 @app.command("sources")
-def sources(component: str, db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+def sources(component: str = typer.Argument(..., autocompletion=complete_component), db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
     """
     Look up what Junk Items are a source of a given component (example: `f76 sources 'Lead'`)
     """
-    q = """
-    SELECT i.name, s.quantity
-    FROM component c
-    JOIN item_scraps s ON s.component_id = c.id
-    JOIN item        i ON i.id = s.item_id
-    WHERE c.name = ? COLLATE NOCASE
-    ORDER BY s.quantity DESC, i.name;
-    """
     db_path = resolve_db_path(db)
-    rows, _ = fetch_all(db_path, q, (component,)) 
+    rows = api.sources(component, db=db_path)
     if not rows:
         console.print(f"[bold]No items found for component:[/bold] {component} (DB: {db_path})")
         raise typer.Exit(1)
@@ -101,48 +167,34 @@ def sources(component: str, db: str | None = typer.Option(None, help="Path to fa
     console.print(t)
 
 @app.command("whereis")
-def region_for(location: str,db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+def region_for(location: str = typer.Argument(..., autocompletion=complete_location), db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
     """
     Look up what region a location exists in. (example: `f76 whereis 'Wade Airport'`)
     """
-    q = """
-    SELECT r.name
-    FROM region r
-    JOIN location l ON l.region_id = r.id
-    WHERE l.name = ? COLLATE NOCASE
-    """
     db_path = resolve_db_path(db)
-    rows, _ = fetch_all(db_path, q, (location,))
+    rows = api.whereis(location, db=db_path)
     if not rows:
         console.print(f"[bold]No region found for location:[/bold] {location.title()} (DB: {db_path})")
         raise typer.Exit(1)
     t = make_pipboy_table(f'{location.title()} is located in:')
     t.add_column("Region");
-    # fetchall returns a list of tuples - even for one col
-    for (region,) in rows:
+    for region in rows:
         t.add_row(region)
     console.print(t)
 
 @app.command("places")
-def locations_in(region: str,db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+def locations_in(region: str = typer.Argument(..., autocompletion=complete_region), db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
     """
     Look up what locations are in a region of the map (example: `f76 places 'Cranberry Bog'`)
     """
-    q = """
-    SELECT l.name
-    FROM location l
-    JOIN region r ON l.region_id = r.id
-    WHERE r.name = ? COLLATE NOCASE
-    ORDER BY l.name
-    """
     db_path = resolve_db_path(db)
-    rows, _ = fetch_all(db_path, q, (region,))
+    rows = api.places(region, db=db_path)
     if not rows:
         console.print(f"[bold]No locations found for region:[/bold] {region.title()}")
         raise typer.Exit(1)
     t = make_pipboy_table(f'{region.title()} is home to the following locations:')
     t.add_column("Locations");
-    for (location_name,) in rows:
+    for location_name in rows:
         t.add_row(location_name)
     console.print(t)
 
@@ -151,41 +203,35 @@ def locations_in(db: str | None = typer.Option(None, help="Path to fallout.sqlit
     """
     List all the regions of the map (example: `f76 regions`)
     """
-    q = """
-    SELECT r.name
-    FROM region r
-    ORDER BY r.name
-    """
     db_path = resolve_db_path(db)
-    rows, _ = fetch_all(db_path, q)
+    rows = api.regions(db=db_path)
     if not rows:
         console.print(f"[bold]No regions found.[/bold] Have you ran `f76 init`?")
         raise typer.Exit(1)
     t = make_pipboy_table(f'You will find the following Regions in Appalachia:')
     t.add_column("Regions");
-    for (region_name,) in rows:
+    for region_name in rows:
         t.add_row(region_name)
     console.print(t)
 
 @app.command("where")
-def where(item: str, db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+def where(item: str = typer.Argument(..., autocompletion=complete_item), db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
     db_path = resolve_db_path(db)
-    # lazy pop: scrape if we have no rows
-    q_check = "SELECT COUNT(*) FROM item_locations il JOIN item i ON i.id = il.item_id WHERE i.name = ? COLLATE NOCASE"
+    # lazy pop: scrape the item's page the first time it's asked for
+    # (item_crawl, not item_locations - the location crawler may already have added some of its rows)
+    q_check = "SELECT COUNT(*) FROM item_crawl c JOIN item i ON i.id = c.item_id WHERE i.name = ? COLLATE NOCASE"
     rows, _ = fetch_all(db_path, q_check, (item,))
     if rows[0][0] == 0:
-        scrape_item_locations_by_name(item, db_path)
+        import requests
+        from .scripts.scrape.junk_locations import scrape_item_locations_by_name
+        try:
+            scrape_item_locations_by_name(item, db_path)
+        except requests.RequestException as e:
+            # offline, or the wiki is down - what we already have is still worth showing
+            console.print(f"[bold]Couldn't fetch the wiki page for {escape(item)}[/bold] ({type(e).__name__}) - showing stored locations only.")
 
     # run the search now that we know we have the data
-    q = """
-    SELECT l.name, il.quantity, il.description
-    FROM item_locations il
-    JOIN item i ON i.id = il.item_id
-    JOIN location l ON l.id = il.location_id
-    WHERE i.name = ? COLLATE NOCASE
-    ORDER BY l.name, il.quantity IS NULL, COALESCE(il.quantity, 0) DESC;
-    """
-    results, _ = fetch_all(db_path, q, (item,))
+    results = api.where(item, db=db_path)
     if not results:
         console.print(f"[bold]No locations for {item}.[/bold]")
         raise typer.Exit(1)
@@ -200,17 +246,448 @@ def where(item: str, db: str | None = typer.Option(None, help="Path to fallout.s
     console.print(t)
         
 
+LOOT_SQL = """
+SELECT i.name, il.quantity, NULLIF(d.text, '')
+FROM location l
+JOIN item_locations il ON il.location_id = l.id
+JOIN item i ON i.id = il.item_id
+JOIN description d ON d.id = il.description_id
+WHERE l.name = ? COLLATE NOCASE
+ORDER BY i.name, il.quantity IS NULL, COALESCE(il.quantity, 0) DESC;
+"""
+
+@app.command("loot")
+def loot(location: str = typer.Argument(..., autocompletion=complete_location), db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+         refresh: bool = typer.Option(False, help="Re-crawl the location page even if it was crawled before")):
+    """
+    Look up what junk spawns at a location (example: `f76 loot 'Wade Airport'`)
+    """
+    db_path = resolve_db_path(db)
+    q_ids = "SELECT id FROM location WHERE name = ? COLLATE NOCASE"
+    ids, _ = fetch_all(db_path, q_ids, (location,))
+    if not ids:
+        console.print(f"[bold]No location found for:[/bold] {location} (DB: {db_path})")
+        raise typer.Exit(1)
+    # lazy pop: crawl the location page(s) the first time we're asked
+    from .scripts.scrape.location_pages import crawl_locations
+    crawl_locations([lid for (lid,) in ids], db_path, refresh=refresh)
+
+    results, _ = fetch_all(db_path, LOOT_SQL, (location,))
+    if not results:
+        console.print(f"[bold]No junk found at {location}.[/bold]")
+        raise typer.Exit(1)
+    t = make_pipboy_table(f'Junk you will find at {location}:')
+    t.add_column("Item")
+    t.add_column("Qty", justify="right")
+    t.add_column("Description", overflow="fold")
+    for (item_name, qty, desc) in results:
+        t.add_row(item_name, str(qty) if qty is not None else "-", desc)
+    console.print(t)
+
+@app.command("crawl-locations")
+def crawl_all_locations(db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+                        workers: int = typer.Option(4, help="Max pages fetched at once (the crawler adapts below this while the wiki is slow or erroring)"),
+                        refresh: bool = typer.Option(False, help="Re-crawl locations crawled before")):
+    """
+    Crawl every location page for junk spawns (feeds `loot`, `where` and `farm`)
+    """
+    from .scripts.scrape.location_pages import crawl_locations
+    db_path = resolve_db_path(db)
+    crawled, inserted = crawl_locations(None, db_path, workers=workers, refresh=refresh)
+    console.print(f"Crawled {crawled} location pages, added {inserted} item locations.")
+
+# Both queries read the pre-summed rollup tables, kept current by triggers (see 0001_initial_schema.sql)
+FARM_REGIONS_SQL = """
+SELECT r.name, y.yield
+FROM component c
+JOIN region_component_yield y ON y.component_id = c.id
+JOIN region r ON r.id = y.region_id
+WHERE c.name = ? COLLATE NOCASE AND y.yield > 0
+ORDER BY y.yield DESC, r.name;
+"""
+
+FARM_LOCATIONS_SQL = """
+SELECT l.name, r.name, y.yield
+FROM component c
+JOIN location_component_yield y ON y.component_id = c.id
+JOIN location l ON l.id = y.location_id
+JOIN region   r ON r.id = l.region_id
+WHERE c.name = ? COLLATE NOCASE AND y.yield > 0
+ORDER BY y.yield DESC, l.name
+LIMIT ?;
+"""
+
+@app.command("farm")
+def farm(component: str = typer.Argument(..., autocompletion=complete_component), db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+         limit: int = typer.Option(15, help="How many locations to list")):
+    """
+    Look up which regions and locations yield the most of a component (example: `f76 farm 'Lead'`)
+    """
+    db_path = resolve_db_path(db)
+    regions, _ = fetch_all(db_path, FARM_REGIONS_SQL, (component,))
+    if not regions:
+        console.print(f"[bold]No location data for component:[/bold] {component} (DB: {db_path})")
+        console.print("Spawn locations are scraped per item - try `f76 where <item>` for a few of its sources first.")
+        raise typer.Exit(1)
+    locations, _ = fetch_all(db_path, FARM_LOCATIONS_SQL, (component, limit))
+    t = make_pipboy_table(f'Best regions to farm "{component}":')
+    t.add_column("Region"); t.add_column("Yield", justify="right")
+    for region_name, total in regions:
+        t.add_row(region_name, str(total))
+    console.print(t)
+    t = make_pipboy_table(f'Best locations to farm "{component}":')
+    t.add_column("Location"); t.add_column("Region"); t.add_column("Yield", justify="right")
+    for location_name, region_name, total in locations:
+        t.add_row(location_name, region_name, str(total))
+    console.print(t)
+
+# recipe_material is the precomputed closure - no recursion needed at query time
+# ROW_NUMBER() ranks each material's junk sources so we can keep the top N
+# Docs: https://sqlite.org/windowfunctions.html#builtins
+CRAFT_SQL = """
+WITH ranked AS (
+  SELECT m.material, m.quantity, i.name AS item, s.quantity AS yield,
+         ROW_NUMBER() OVER (PARTITION BY m.material ORDER BY s.quantity DESC, i.name) AS rn
+  FROM recipe r
+  JOIN recipe_material m ON m.recipe_id = r.id
+  LEFT JOIN component   c ON c.name = m.material COLLATE NOCASE
+  LEFT JOIN item_scraps s ON s.component_id = c.id
+  LEFT JOIN item        i ON i.id = s.item_id
+  WHERE r.name = ? COLLATE NOCASE
+)
+SELECT material, quantity, GROUP_CONCAT(item || ' x' || yield, ', ') AS sources
+FROM ranked
+WHERE rn <= ?
+GROUP BY material, quantity
+ORDER BY quantity DESC, material;
+"""
+
+@app.command("craft")
+def craft(recipe: str = typer.Argument(..., autocompletion=complete_recipe), db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+          top: int = typer.Option(3, help="How many junk sources to show per material")):
+    """
+    Look up the raw materials a recipe needs and the best junk to scrap for them (example: `f76 craft 'Healing Salve'`)
+    """
+    db_path = resolve_db_path(db)
+    rows, _ = fetch_all(db_path, CRAFT_SQL, (recipe, top))
+    if not rows:
+        console.print(f"[bold]No recipe found for:[/bold] {recipe} (DB: {db_path})")
+        raise typer.Exit(1)
+    t = make_pipboy_table(f'"{recipe}" needs:', width=90)
+    t.add_column("Material", no_wrap=True); t.add_column("Qty", justify="right", no_wrap=True)
+    t.add_column("Junk sources", overflow="fold")
+    for material, qty, sources in rows:
+        t.add_row(material, str(qty), sources or "-")
+    console.print(t)
+
+@app.command("yield")
+def stash_yield(stash: pathlib.Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV export of item,count rows"),
+                db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+    """
+    Total up the components a stash export scraps into (example: `f76 yield stash.csv`)
+    """
+    from .scripts.stash_utils import iter_stash_rows, load_stash, stash_component_totals, stash_unmatched
+    db_path = resolve_db_path(db)
+    with get_conn(db_path) as cx:
+        load_stash(cx, iter_stash_rows(stash))
+        totals = stash_component_totals(cx)
+        unmatched = stash_unmatched(cx)
+    if not totals and not unmatched:
+        console.print(f"[bold]No items found in:[/bold] {stash}")
+        raise typer.Exit(1)
+    if totals:
+        t = make_pipboy_table(f'Scrapping "{stash.name}" yields:')
+        t.add_column("Component"); t.add_column("Total", justify="right")
+        for comp, total in totals:
+            t.add_row(comp, str(total))
+        console.print(t)
+    if unmatched:
+        t = make_pipboy_table("Unmatched items:")
+        t.add_column("Item"); t.add_column("Count", justify="right")
+        for name, count in unmatched:
+            t.add_row(name, str(count))
+        console.print(t)
+
+@app.command("games")
+def list_games():
+    """
+    List the datasets f76 knows about and whether each one has been initialized
+    """
+    t = make_pipboy_table("Datasets:", width=90)
+    t.add_column("Key", no_wrap=True); t.add_column("Game", no_wrap=True); t.add_column("Database", overflow="fold")
+    for key, game in GAMES.items():
+        path = resolve_db_path(None, game)
+        status = str(path) if path.exists() else f"{path} (run `f76 --game {key} init`)"
+        marker = " *" if key == state["game"] else ""
+        t.add_row(key + marker, game.title, status)
+    console.print(t)
+
+@app.command("compare-scrap")
+def compare_scrap(item: str = typer.Argument(..., autocompletion=complete_item),
+                  games: str = typer.Option(",".join(GAMES), help="Comma separated games to compare")):
+    """
+    Compare what an item scraps into across games (example: `f76 compare-scrap 'Desk fan'`)
+    """
+    # Only this command ever opens more than one dataset: the first game's DB is the main connection,
+    # the rest are ATTACHed just for this query, then the connection is thrown away.
+    # Docs: https://sqlite.org/lang_attach.html
+    from .scripts.db_utils import query_games
+    wanted = []
+    for key in games.split(","):
+        try:
+            game = get_game(key.strip())
+        except KeyError as e:
+            raise typer.BadParameter(str(e.args[0]), param_hint="--games")
+        path = resolve_db_path(None, game)
+        if path.exists():
+            wanted.append((game, path))
+        else:
+            console.print(f"[dim]Skipping {game.title}: no database at {path}[/dim]")
+    if not wanted:
+        console.print("[bold]No datasets to compare.[/bold] Run `f76 --game <key> init` first.")
+        raise typer.Exit(1)
+
+    q = """
+    SELECT c.name, s.quantity
+    FROM {schema}.item i
+    JOIN {schema}.item_scraps s ON s.item_id = i.id
+    JOIN {schema}.component   c ON c.id = s.component_id
+    WHERE i.name = ? COLLATE NOCASE
+    """
+    rows = query_games([(g.key, p) for g, p in wanted], q, (item,))
+    if not rows:
+        console.print(f"[bold]No scraps found for:[/bold] {item} in {', '.join(g.title for g, _ in wanted)}")
+        raise typer.Exit(1)
+    # pivot (game, component, qty) rows into one column per game
+    by_component: dict[str, dict[str, int]] = {}
+    for key, comp, qty in rows:
+        by_component.setdefault(comp, {})[key] = qty
+    t = make_pipboy_table(f'"{item}" scraps for:', width=max(60, 20 + 14 * len(wanted)))
+    t.add_column("Component", no_wrap=True)
+    for game, _ in wanted:
+        t.add_column(game.title, justify="right", no_wrap=True)
+    for comp in sorted(by_component):
+        t.add_row(comp, *(str(by_component[comp].get(g.key, "-")) for g, _ in wanted))
+    console.print(t)
+
+# Every generation from the first run started on/after `since`, read off the run_id indexes,
+# each joined to the key's previous history row (p) - whenever that was - for the "before" side.
+# Only values that changed count: the 'baseline' snapshot and keys seen for the first time
+# (a first scrape, a newly scraped item) have no previous row, so the inner join leaves them out.
+CHANGES_SCRAP_SQL = """
+SELECT r.started_at, i.name, c.name, p.quantity, h.quantity   -- a NULL quantity: not a component then
+FROM scrap_history h
+JOIN scrape_run r ON r.id = h.run_id
+JOIN item       i ON i.id = h.item_id
+JOIN component  c ON c.id = h.component_id
+JOIN scrap_history p
+  ON p.item_id = h.item_id AND p.component_id = h.component_id
+ AND p.run_id = (SELECT MAX(q.run_id) FROM scrap_history q
+                 WHERE q.item_id = h.item_id AND q.component_id = h.component_id AND q.run_id < h.run_id)
+WHERE h.run_id >= (SELECT MIN(id) FROM scrape_run WHERE started_at >= ?)  -- NULL (no rows) if nothing ran since
+  AND r.scraper <> 'baseline'
+ORDER BY h.run_id, i.name, c.name
+"""
+
+CHANGES_SPAWN_SQL = """
+SELECT r.started_at, i.name, l.name, d.text, p.present, p.quantity, h.present, h.quantity
+FROM location_history h
+JOIN scrape_run  r ON r.id = h.run_id
+JOIN item        i ON i.id = h.item_id
+JOIN location    l ON l.id = h.location_id
+JOIN description d ON d.id = h.description_id
+JOIN location_history p
+  ON p.item_id = h.item_id AND p.location_id = h.location_id AND p.description_id = h.description_id
+ AND p.run_id = (SELECT MAX(q.run_id) FROM location_history q
+                 WHERE q.item_id = h.item_id AND q.location_id = h.location_id
+                   AND q.description_id = h.description_id AND q.run_id < h.run_id)
+WHERE h.run_id >= (SELECT MIN(id) FROM scrape_run WHERE started_at >= ?)  -- NULL (no rows) if nothing ran since
+  AND r.scraper <> 'baseline'
+ORDER BY h.run_id, i.name, l.name
+"""
+
+@app.command("changes")
+def changes(since: str = typer.Option(..., "--since", help="Show changes from scrapes started on/after this date (YYYY-MM-DD, UTC)"),
+            db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
+    """
+    List scrap recipe and spawn changes picked up by scrapes since a date (example: `f76 changes --since 2025-01-01`)
+    """
+    db_path = resolve_db_path(db)
+    since_iso = _history_bound(since, "--since", end_of_day=False)
+    scrap_rows, _ = fetch_all(db_path, CHANGES_SCRAP_SQL, (since_iso,))
+    spawn_rows, _ = fetch_all(db_path, CHANGES_SPAWN_SQL, (since_iso,))
+    if not scrap_rows and not spawn_rows:
+        console.print(f"No changes since {since} (DB: {db_path})")
+        return
+
+    if scrap_rows:
+        t = make_pipboy_table(f"Scrap changes since {since}:", width=90)
+        t.add_column("Scraped", no_wrap=True); t.add_column("Item"); t.add_column("Component", no_wrap=True)
+        t.add_column("Before", justify="right"); t.add_column("After", justify="right")
+        for started, item_name, comp, before, after in scrap_rows:
+            t.add_row(started[:10], item_name, comp, "-" if before is None else str(before), "removed" if after is None else str(after))
+        console.print(t)
+    if spawn_rows:
+        def qty(present, quantity) -> str:
+            # "-": not spawning there, "?": spawns, but the wiki doesn't say how many
+            return "-" if not present else "?" if quantity is None else str(quantity)
+        t = make_pipboy_table(f"Spawn changes since {since}:", width=100)
+        t.add_column("Scraped", no_wrap=True); t.add_column("Item"); t.add_column("Location")
+        t.add_column("Change", no_wrap=True); t.add_column("Before", justify="right"); t.add_column("After", justify="right")
+        t.add_column("Description", overflow="fold")
+        for started, item_name, loc, desc, was_present, before, present, after in spawn_rows:
+            before_qty, after_qty = qty(was_present, before), qty(present, after)
+            change = ("removed" if not present else
+                      f"changed qty {before_qty}→{after_qty}" if was_present else "added")
+            t.add_row(started[:10], item_name, loc, change, before_qty, after_qty, desc)
+        console.print(t)
+
+@app.command("export")
+def export_dataset(out: pathlib.Path | None = typer.Argument(None, help="Pack file (or, for parquet/arrow, directory) to write"),
+                   db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+                   fmt: str = typer.Option("pack", "--format", help="pack (for `f76 import`), parquet or arrow (for analytics)")):
+    """
+    Export the database as a dataset pack, or as Parquet/Arrow tables (example: `f76 export --format parquet`)
+    """
+    db_path = resolve_db_path(db)
+    if not db_path.exists():
+        console.print(f"[bold]No database at {db_path}.[/bold] Have you ran `f76 init`?")
+        raise typer.Exit(1)
+    if fmt != "pack":
+        from .scripts.columnar_export import ExportError, export_columnar
+        from .scripts.dataset_pack import default_pack_name
+        out = out or pathlib.Path(default_pack_name().removesuffix(".tar.xz") + f"-{fmt}")
+        try:
+            written = export_columnar(db_path, out, fmt)
+        except ExportError as e:
+            # escape() so "f76[arrow]" isn't read as rich markup
+            console.print(f"[bold]Export failed:[/bold] {escape(str(e))}")
+            raise typer.Exit(1)
+        t = make_pipboy_table(f"Wrote {out}:")
+        t.add_column("File"); t.add_column("Rows", justify="right")
+        for name, rows in written.items():
+            t.add_row(name, f"{rows:,}")
+        console.print(t)
+        return
+
+    from .scripts.dataset_pack import default_pack_name, export_pack
+    out = out or pathlib.Path(default_pack_name())
+    manifest = export_pack(db_path, out)
+    console.print(f"Wrote {out} ({out.stat().st_size:,} bytes, schema v{manifest['schema_version']}, "
+                  f"{manifest['row_counts'].get('item', 0)} items)")
+    console.print(f"sha256: {manifest['sha256']}")
+
+@app.command("import")
+def import_dataset(pack: pathlib.Path = typer.Argument(..., exists=True, dir_okay=False, help="Pack file from `f76 export`"),
+                   db: str | None = typer.Option(None, help="Where to install fallout.sqlite (default: your user data dir)"),
+                   force: bool = typer.Option(False, help="Replace an existing database")):
+    """
+    Install a dataset pack instead of scraping the wiki (example: `f76 import f76-dataset-20250101.tar.xz`)
+    """
+    from .scripts.dataset_pack import PackError, import_pack
+    # Packs are for installed copies - go to the user data dir unless told otherwise
+    db_path = pathlib.Path(db or os.environ.get("F76_DB") or default_data_dir() / active_game().db_filename)
+    try:
+        manifest = import_pack(pack, db_path, force=force)
+    except (PackError, FileExistsError) as e:
+        console.print(f"[bold]Import failed:[/bold] {e}")
+        raise typer.Exit(1)
+    console.print(f"Installed dataset scraped {manifest['scraped_at']} at: {db_path}")
+    t = make_pipboy_table("Rows imported:")
+    t.add_column("Table"); t.add_column("Rows", justify="right")
+    for table, count in manifest["row_counts"].items():
+        t.add_row(table, str(count))
+    console.print(t)
+
+@app.command("stats")
+def stats(db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+          limit: int = typer.Option(10, help="How many recent runs to show")):
+    """
+    Show recent scrape runs and pages whose latest fetch looks off (example: `f76 stats`)
+    """
+    from .scripts.ledger import recent_runs, regressions
+    db_path = resolve_db_path(db)
+    if not db_path.exists():
+        console.print(f"[bold]No database at {db_path}.[/bold] Have you ran `f76 init`?")
+        raise typer.Exit(1)
+    runs = recent_runs(db_path, limit)
+    if not runs:
+        console.print("No scrape runs recorded yet.")
+        return
+    t = make_pipboy_table("Recent scrape runs:", width=110)
+    t.add_column("Run", justify="right"); t.add_column("Scraper", no_wrap=True); t.add_column("Started", no_wrap=True)
+    t.add_column("Secs", justify="right"); t.add_column("Status"); t.add_column("Pages", justify="right")
+    t.add_column("Bytes", justify="right"); t.add_column("Ins", justify="right")
+    t.add_column("Upd", justify="right"); t.add_column("Skip", justify="right")
+    for run_id, scraper, started, secs, status, pages, size, ins, upd, skip in runs:
+        status = status if status == "ok" else f"[bold]{status}[/bold]"
+        t.add_row(str(run_id), scraper, started, "-" if secs is None else f"{secs:.1f}", status,
+                  str(pages), f"{size:,}", str(ins), str(upd), str(skip))
+    console.print(t)
+
+    flagged = regressions(db_path)
+    if not flagged:
+        console.print("No regressions against recent runs.")
+        return
+    t = make_pipboy_table("Possible regressions (usual -> latest):", width=110)
+    t.add_column("Page", overflow="fold"); t.add_column("Metric", no_wrap=True); t.add_column("Change", no_wrap=True)
+    for url, metric, change in flagged:
+        t.add_row(url, metric, change)
+    console.print(t)
+
+@app.command("maintain")
+def maintain(db: str | None = typer.Option(None, help="Path to fallout.sqlite"),
+             vacuum: bool | None = typer.Option(None, "--vacuum/--no-vacuum",
+                                                help="Always / never compact (default: only when lots of pages are free)"),
+             quick: bool = typer.Option(False, help="quick_check instead of the full integrity_check")):
+    """
+    Refresh query planner statistics, check foreign keys & integrity, compact the file (example: `f76 maintain`)
+    """
+    from .scripts.maintenance import maintain as run_maintenance
+    db_path = resolve_db_path(db)
+    if not db_path.exists():
+        console.print(f"[bold]No database at {db_path}.[/bold] Have you ran `f76 init`?")
+        raise typer.Exit(1)
+    report = run_maintenance(db_path, vacuum=vacuum, quick=quick)
+    t = make_pipboy_table(f"Maintenance of {db_path.name}:", width=90)
+    t.add_column("Step", no_wrap=True); t.add_column("Secs", justify="right"); t.add_column("Result", overflow="fold")
+    for name, seconds, result in report["steps"]:
+        t.add_row(name, f"{seconds:.2f}", result)
+    console.print(t)
+    before, after = report["bytes_before"], report["bytes_after"]
+    total = sum(seconds for _, seconds, _ in report["steps"])
+    # ANALYZE's statistics table can grow a small file by a page or two
+    change = "reclaimed" if before >= after else "grew by"
+    console.print(f"Size: {before / 1024 / 1024:.1f} MiB -> {after / 1024 / 1024:.1f} MiB "
+                  f"({change} {abs(before - after) / 1024:,.0f} KiB) in {total:.1f}s")
+    if report["problems"]:
+        t = make_pipboy_table("Problems found:", width=90)
+        t.add_column("Problem", overflow="fold")
+        for problem in report["problems"]:
+            t.add_row(escape(problem))
+        console.print(t)
+        raise typer.Exit(1)
+
 @app.command("init")
 def init(db: str | None = typer.Option(None, help="Path to fallout.sqlite")):
     """
     Create/populate the database by running the scraper once.
     """
+    from .scripts.scrape.junk_items_table import main as scrape_junk_items
+    from .scripts.scrape.regions_and_locations import main as scrape_regions_and_locations
+    from .scripts.scrape.crafting_recipes import main as scrape_crafting_recipes
+    game = active_game()
     db_path = resolve_db_path(db)
     # Pass the target path via env var 
     os.environ["F76_DB_TARGET"] = str(db_path)
-    console.print(f"Initializing DB at: {db_path}")
+    console.print(f"Initializing {game.title} DB at: {db_path}")
     console.print(f"Preparing to initialize Scrap & Junk Items")
-    scrape_junk_items(db_path)
+    with profiling.stage("scrape: junk items"):
+        scrape_junk_items(db_path, game)
     console.print(f"Preparing to initialize Regions & Locations")
-    scrape_regions_and_locations(db_path)
+    with profiling.stage("scrape: regions & locations"):
+        scrape_regions_and_locations(db_path, game)
+    console.print(f"Preparing to initialize Crafting Recipes")
+    with profiling.stage("scrape: crafting recipes"):
+        scrape_crafting_recipes(db_path, game)
     console.print("[green]Done.[/green]")
\ No newline at end of file
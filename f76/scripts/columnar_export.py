@@ -0,0 +1,148 @@
+import datetime, pathlib, sqlite3
+from contextlib import closing
+
+from .db_utils import get_conn
+
+# pyarrow is optional - only `f76 export --format parquet|arrow` needs it (pip install 'f76[arrow]')
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# --- Columnar export ---
+# Writes analysis-ready tables - names instead of ids, joins already done - as Parquet or Arrow IPC files,
+# one file per dataset, so pandas/polars/DuckDB can load them without any SQL.
+#
+# 🫧 Refresh - Dictionary encoding 🫧
+# A column like "component" repeats a few dozen names across millions of rows. Dictionary encoding stores
+# each distinct name once (the dictionary) and every row as a small integer index into it.
+# Here the dictionaries come straight from the dimension tables (item, component, location, region, description),
+# so the joins are never run in SQL: each row's ids are mapped to dictionary indexes in Python,
+# and every batch of a file shares the same dictionary. pandas reads these columns as Categoricals.
+# Docs: https://arrow.apache.org/docs/format/Columnar.html#dictionary-encoded-layout
+#
+# Rows are streamed out of SQLite `BATCH_ROWS` at a time and written as record batches,
+# so memory use stays flat however big the history tables get.
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+BATCH_ROWS = 64 * 1024
+
+class ExportError(Exception):
+    """The export can't run (missing pyarrow, unknown format)"""
+
+def _dictionary(conn: sqlite3.Connection, sql: str):
+    """
+    Build a dimension's dictionary from `sql` returning (id, name) rows.
+    Returns (pyarrow string array of distinct names, {id: index into it}).
+    Names that repeat (locations share names across regions) share one dictionary entry.
+    """
+    values: list[str] = []
+    position: dict[str, int] = {}
+    index: dict[int, int] = {}
+    for row_id, name in conn.execute(sql):
+        if name not in position:
+            position[name] = len(values)
+            values.append(name)
+        index[row_id] = position[name]
+    return pa.array(values, pa.string()), index
+
+def _encode(ids, dims) -> "pa.DictionaryArray":
+    dictionary, index = dims
+    return pa.DictionaryArray.from_arrays(pa.array([index.get(i) for i in ids], pa.int32()), dictionary)
+
+def _dict_type():
+    return pa.dictionary(pa.int32(), pa.string())
+
+def _datasets(conn: sqlite3.Connection) -> dict:
+    """
+    name -> (schema, fact query, batch builder). Builders turn a list of fact rows into column arrays.
+    """
+    items = _dictionary(conn, "SELECT id, name FROM item ORDER BY id")
+    components = _dictionary(conn, "SELECT id, name FROM component ORDER BY id")
+    locations = _dictionary(conn, "SELECT id, name FROM location ORDER BY id")
+    regions = _dictionary(conn, "SELECT id, name FROM region ORDER BY id")
+    # id 0 (no description) is left out, so it maps to null
+    descriptions = _dictionary(conn, "SELECT id, text FROM description WHERE id <> 0 ORDER BY id")
+    # region of each location, so the hierarchy rides along without a join
+    region_of = dict(conn.execute("SELECT id, region_id FROM location"))
+    # generation -> when it was scraped
+    scraped_at = {rid: datetime.datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+                  for rid, ts in conn.execute("SELECT id, started_at FROM scrape_run")}
+    ts_type = pa.timestamp("s", tz="UTC")
+
+    return {
+        "scraps": (
+            pa.schema([("item", _dict_type()), ("component", _dict_type()), ("quantity", pa.int32())]),
+            "SELECT item_id, component_id, quantity FROM item_scraps",
+            lambda item, comp, qty: [_encode(item, items), _encode(comp, components), pa.array(qty, pa.int32())],
+        ),
+        "spawns": (
+            pa.schema([("item", _dict_type()), ("location", _dict_type()), ("region", _dict_type()),
+                       ("quantity", pa.int32()), ("description", _dict_type())]),
+            "SELECT item_id, location_id, quantity, description_id FROM item_locations",
+            lambda item, loc, qty, desc: [_encode(item, items), _encode(loc, locations),
+                                          _encode([region_of.get(l) for l in loc], regions),
+                                          pa.array(qty, pa.int32()), _encode(desc, descriptions)],
+        ),
+        "locations": (
+            pa.schema([("location", _dict_type()), ("region", _dict_type()), ("url", pa.string())]),
+            "SELECT id, region_id, url FROM location",
+            lambda loc, region, url: [_encode(loc, locations), _encode(region, regions), pa.array(url, pa.string())],
+        ),
+        "scrap_history": (
+            pa.schema([("item", _dict_type()), ("component", _dict_type()), ("generation", pa.int64()),
+                       ("scraped_at", ts_type), ("quantity", pa.int32())]),   # quantity null = removed
+            "SELECT item_id, component_id, run_id, quantity FROM scrap_history",
+            lambda item, comp, run, qty: [_encode(item, items), _encode(comp, components), pa.array(run, pa.int64()),
+                                          pa.array([scraped_at.get(r) for r in run], ts_type), pa.array(qty, pa.int32())],
+        ),
+        "spawn_history": (
+            pa.schema([("item", _dict_type()), ("location", _dict_type()), ("region", _dict_type()),
+                       ("generation", pa.int64()), ("scraped_at", ts_type), ("quantity", pa.int32()),
+                       ("present", pa.bool_()), ("description", _dict_type())]),
+            "SELECT item_id, location_id, run_id, quantity, present, description_id FROM location_history",
+            lambda item, loc, run, qty, present, desc: [
+                _encode(item, items), _encode(loc, locations), _encode([region_of.get(l) for l in loc], regions),
+                pa.array(run, pa.int64()), pa.array([scraped_at.get(r) for r in run], ts_type),
+                pa.array(qty, pa.int32()), pa.array([bool(p) for p in present], pa.bool_()), _encode(desc, descriptions)],
+        ),
+    }
+
+def _writer(path: pathlib.Path, schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    # Arrow IPC file (a.k.a. Feather v2) - can be memory-mapped and read without copying
+    return pa.ipc.new_file(path, schema)
+
+def export_columnar(db_path: pathlib.Path, out_dir: pathlib.Path, fmt: str = "parquet") -> dict[str, int]:
+    """
+    Write every dataset as `<out_dir>/<name>.parquet` (or `.arrow`).
+    - Each file is written to a temp name and renamed when complete
+    Returns {file name: rows written}.
+    """
+    # format first, so a typo isn't reported as a missing pyarrow
+    if fmt not in FORMATS:
+        raise ExportError(f"unknown format {fmt!r} - expected one of: {', '.join(FORMATS)} (or omit --format for a dataset pack)")
+    if pa is None:
+        raise ExportError("columnar export needs pyarrow - install it with: pip install 'f76[arrow]'")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    written: dict[str, int] = {}
+    with closing(get_conn(db_path)) as conn:
+        for name, (schema, sql, build) in _datasets(conn).items():
+            path = out_dir / (name + FORMATS[fmt])
+            tmp = path.with_name(path.name + ".tmp")
+            rows = 0
+            cur = conn.execute(sql)
+            try:
+                with _writer(tmp, schema, fmt) as writer:
+                    while batch := cur.fetchmany(BATCH_ROWS):
+                        # rows -> columns, then one array per column
+                        writer.write_batch(pa.RecordBatch.from_arrays(build(*zip(*batch)), schema=schema))
+                        rows += len(batch)
+                tmp.replace(path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            written[path.name] = rows
+    return written
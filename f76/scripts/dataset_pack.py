@@ -0,0 +1,147 @@
+import datetime, hashlib, io, json, os, pathlib, sqlite3, tarfile
+from contextlib import closing
+
+from .db_utils import get_conn, latest_version
+from .name_cache import write_name_cache
+
+# --- Dataset packs ---
+# A pack is a snapshot of fallout.sqlite that can be installed on another machine without scraping.
+# It's an xz-compressed tar with exactly two members, in this order:
+#   manifest.json   - scrape date, row counts, schema version, size + sha256 of the DB
+#   fallout.sqlite  - the DB itself, VACUUMed so it carries no free pages
+# Putting the manifest first means an import can read it, then stream-decompress the DB
+# straight to disk while hashing it - the pack is never unpacked into memory or a temp dir.
+# Docs: https://docs.python.org/3/library/tarfile.html
+
+PACK_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+DB_NAME = "fallout.sqlite"
+CHUNK_SIZE = 1024 * 1024
+
+class PackError(Exception):
+    """A pack that is malformed, corrupt, or too new for this version of f76"""
+
+def _sha256_file(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _row_counts(conn: sqlite3.Connection) -> dict[str, int]:
+    tables = [name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    # table names come from sqlite_master, not user input
+    return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+
+def _last_scrape(conn: sqlite3.Connection) -> datetime.datetime | None:
+    """
+    When the last successful scrape finished, from the scrape ledger (None if it has no runs).
+    Not the file's mtime - migrations, ANALYZE and VACUUM all touch that without scraping anything.
+    The 'baseline' run is skipped too: it's stamped with the time history was switched on, not a scrape
+    """
+    (finished,) = conn.execute(
+        "SELECT MAX(finished_at) FROM scrape_run WHERE status = 'ok' AND scraper <> 'baseline'"
+    ).fetchone()
+    if finished is None:
+        return None
+    return datetime.datetime.strptime(finished, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+
+def default_pack_name() -> str:
+    return f"f76-dataset-{datetime.date.today():%Y%m%d}.tar.xz"
+
+def export_pack(db_path: pathlib.Path, out_path: pathlib.Path) -> dict:
+    """
+    Write a compressed, checksummed snapshot of `db_path` to `out_path`.
+    Returns the manifest that was written.
+    """
+    snapshot = out_path.with_name(out_path.name + ".sqlite.tmp")
+    snapshot.unlink(missing_ok=True)
+    try:
+        with closing(get_conn(db_path)) as conn:
+            # VACUUM INTO writes a compacted, transactionally consistent copy without touching the source
+            # Docs: https://sqlite.org/lang_vacuum.html#vacuuminto
+            conn.execute("VACUUM INTO ?", (str(snapshot),))
+        with closing(sqlite3.connect(snapshot)) as snap:
+            schema_version = snap.execute("PRAGMA user_version").fetchone()[0]
+            row_counts = _row_counts(snap)
+            scraped_at = _last_scrape(snap) or datetime.datetime.fromtimestamp(db_path.stat().st_mtime, datetime.timezone.utc)
+
+        manifest = {
+            "format": PACK_FORMAT,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "scraped_at": scraped_at.isoformat(timespec="seconds"),
+            "schema_version": schema_version,
+            "row_counts": row_counts,
+            "size": snapshot.stat().st_size,
+            "sha256": _sha256_file(snapshot),
+        }
+        manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+
+        tmp_out = out_path.with_name(out_path.name + ".tmp")
+        with tarfile.open(tmp_out, "w:xz") as tar:
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest_bytes)
+            info.mtime = int(datetime.datetime.now().timestamp())
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+            tar.add(snapshot, arcname=DB_NAME)
+        tmp_out.replace(out_path)
+        return manifest
+    finally:
+        snapshot.unlink(missing_ok=True)
+
+def import_pack(pack_path: pathlib.Path, db_path: pathlib.Path, *, force: bool = False) -> dict:
+    """
+    Install the DB from a pack at `db_path`.
+    - The DB is stream-decompressed to a temp file next to `db_path` while being hashed
+    - Size, sha256 and SQLite's own quick_check must all pass before anything is replaced
+    - The swap into place is a single atomic rename
+    Returns the pack's manifest.
+    """
+    if db_path.exists() and not force:
+        raise FileExistsError(f"{db_path} already exists (use --force to replace it)")
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_db = db_path.with_name(db_path.name + f".{os.getpid()}.import")
+    try:
+        # "r|xz" = stream mode: members are read strictly in order, nothing is seeked or buffered whole
+        with tarfile.open(pack_path, "r|xz") as tar:
+            members = iter(tar)
+            first = next(members, None)
+            if first is None or first.name != MANIFEST_NAME:
+                raise PackError("pack does not start with a manifest")
+            manifest = json.load(tar.extractfile(first))
+            if manifest.get("format") != PACK_FORMAT:
+                raise PackError(f"unsupported pack format: {manifest.get('format')}")
+            if manifest["schema_version"] > latest_version():
+                raise PackError(f"pack schema v{manifest['schema_version']} is newer than this f76 "
+                                f"(v{latest_version()}) - upgrade f76 first")
+
+            second = next(members, None)
+            if second is None or second.name != DB_NAME:
+                raise PackError("pack has no database")
+            h, size = hashlib.sha256(), 0
+            src = tar.extractfile(second)
+            with open(tmp_db, "wb") as out:
+                while chunk := src.read(CHUNK_SIZE):
+                    h.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+
+        if size != manifest["size"] or h.hexdigest() != manifest["sha256"]:
+            raise PackError("checksum mismatch - the pack is corrupt or incomplete")
+        with closing(sqlite3.connect(tmp_db)) as check:
+            (ok,) = check.execute("PRAGMA quick_check").fetchone()
+        if ok != "ok":
+            raise PackError(f"database failed quick_check: {ok}")
+
+        tmp_db.replace(db_path)
+    except (tarfile.TarError, EOFError, KeyError, ValueError) as e:
+        raise PackError(f"unreadable pack: {e}") from e
+    finally:
+        tmp_db.unlink(missing_ok=True)
+
+    # Bring an older pack up to this version's schema, and rebuild the completion cache
+    with closing(get_conn(db_path)) as conn:
+        write_name_cache(conn, db_path)
+    return manifest
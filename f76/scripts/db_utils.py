@@ -1,30 +1,109 @@
-import sqlite3, pathlib
+import contextlib, functools, importlib.resources, re, sqlite3, pathlib
+from typing import Iterator
 
-# Path to the SQL schema def. file
-# `pathlib.Path(__file__)` - current file location
-# `.resolve().parents[1]` - go up 2 levels (current -> scripts/ -> project root)
-# `/ "sql" / "schema.sql"` - append path to the schema file
-# In short: Computing & storing the absolute path to the schema
-# Docs: https://docs.python.org/3/library/pathlib.html
-SCHEMA = pathlib.Path(__file__).resolve().parents[2] / "sql" / "schema.sql"
+from . import profiling
+
+# --- Schema migrations ---
+# The schema ships inside the package as numbered SQL files: f76/sql/migrations/0001_*.sql, 0002_*.sql, ...
+# Reading them through importlib.resources (instead of a path relative to the source tree)
+# means they're found the same way in a repo checkout, a pip/pipx install or a zipped wheel.
+# Docs: https://docs.python.org/3/library/importlib.resources.html
+#
+# The DB remembers the last migration it ran in `PRAGMA user_version` - an integer SQLite keeps
+# in the file header for applications to use. Opening an up-to-date DB is then a single integer check,
+# and a DB from an older version of this tool only runs the migrations it's missing.
+# Docs: https://www.sqlite.org/pragma.html#pragma_user_version
+MIGRATIONS = importlib.resources.files("f76") / "sql" / "migrations"
+MIGRATION_RE = re.compile(r"^(\d+)_.*\.sql$")
+
+@functools.cache
+def migrations() -> tuple[tuple[int, str], ...]:
+    """
+    All (version, filename) pairs, in order. Listed once per process.
+    """
+    found = []
+    for entry in MIGRATIONS.iterdir():
+        m = MIGRATION_RE.match(entry.name)
+        if m:
+            found.append((int(m.group(1)), entry.name))
+    return tuple(sorted(found))
+
+def latest_version() -> int:
+    found = migrations()
+    return found[-1][0] if found else 0
+
+def _split_statements(script: str) -> list[str]:
+    """
+    Split a SQL script into single statements.
+    `sqlite3.complete_statement` uses SQLite's own tokenizer, so semicolons inside
+    strings and CREATE TRIGGER ... BEGIN ... END bodies don't cut a statement short.
+    """
+    statements, buf = [], ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            statements.append(buf.strip())
+            buf = ""
+    if buf.strip():  # trailing comments, or a last statement missing its `;`
+        statements.append(buf.strip())
+    return statements
 
 def get_conn(db_path: pathlib.Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True) # How does this work?
-    conn = sqlite3.connect(db_path)
+    conn = profiling.connect(db_path)
     conn.execute("PRAGMA foreign_keys=ON;")
+    ensure_schema(conn)
     return conn # Return the connection to the sqlite ... instance?
 
 def ensure_schema(conn: sqlite3.Connection):
     """
     Ensure that the databse has the correct schema.
     - Enables foreign key support (disabled by default in SQLite)
-    - Executes the schema.sql to create tables if they don't exist
+    - Runs any migrations newer than the DB's `user_version`, each in its own transaction
 
     SQLite Pragma docs: https://www.sqlite.org/pragma.html
     """
     conn.execute("PRAGMA foreign_keys=ON;")
-    with open(SCHEMA, "r", encoding="utf-8") as f:
-        conn.executescript(f.read())
+    # The common case: already up to date
+    # (a DB written by a *newer* version of the tool is left alone too)
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= latest_version():
+        return
+    conn.commit()
+    for version, filename in migrations():
+        # BEGIN IMMEDIATE takes the write lock up front, then we re-check the version:
+        # if another f76 process migrated while we waited, there's nothing left to do
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                conn.commit()
+                continue
+            script = (MIGRATIONS / filename).read_text(encoding="utf-8")
+            for statement in _split_statements(script):
+                conn.execute(statement)
+            # PRAGMA values can't be bound as parameters - `version` is an int we parsed, not user input
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def stamp_history(conn: sqlite3.Connection, run_id: int | None):
+    """
+    Charge the history rows the triggers write from here on to scrape run `run_id` (None: to no run).
+    Stamp inside the write transaction and clear it before committing (see 0006_history_run.sql)
+    """
+    if run_id is None:
+        conn.execute("DELETE FROM history_run")
+    else:
+        conn.execute("INSERT OR REPLACE INTO history_run(id, run_id) VALUES (1, ?)", (run_id,))
+
+@contextlib.contextmanager
+def stamped(conn: sqlite3.Connection, run_id: int) -> Iterator[sqlite3.Connection]:
+    """`with stamped(conn, run.id):` - like `with conn:` (one transaction), with its history rows charged to the run"""
+    with conn:
+        stamp_history(conn, run_id)
+        yield conn
+        stamp_history(conn, None)
 
 def upsert_item(cur, name: str, url: str | None) -> int:
     """
@@ -56,7 +135,20 @@ def upsert_component(cur, name: str) -> int:
     cur.execute("INSERT INTO component(name) VALUES (?)", (name,))
     return cur.lastrowid
 
-def set_item_scrap(cur, item_id: int, component_id: int, qty: int):
+def intern_description(cur, text: str | None) -> int:
+    """
+    The id of a spawn description in the `description` table, adding it if it's new
+    - item_locations stores this id instead of the text, so a repeated description is stored once
+    - No description (None or '') is id 0
+    """
+    if not text:
+        return 0
+    row = cur.execute("SELECT id FROM description WHERE text = ?", (text,)).fetchone()
+    if row: return row[0]
+    cur.execute("INSERT INTO description(text) VALUES (?)", (text,))
+    return cur.lastrowid
+
+def set_item_scrap(cur, item_id: int, component_id: int, qty: int) -> str:
     """
     Set the scrap quantity for a given `item` -> `component` mapping
     - Uses SQLite's UPSERT capability, which we're implementing through:
@@ -73,14 +165,84 @@ def set_item_scrap(cur, item_id: int, component_id: int, qty: int):
     - `DO UPDATE SET quantity = excluded.quantity`
       - Set the quantity to most current data
       - 🗒️ Note on `excluded` & `UPSERT` below
+
+    Returns what happened for the scrape ledger: 'inserted', 'updated' or 'skipped' (already up to date)
     """
-    
+    row = cur.execute(
+        "SELECT quantity FROM item_scraps WHERE item_id = ? AND component_id = ?", (item_id, component_id)
+    ).fetchone()
+    if row and row[0] == qty:
+        return "skipped"
     cur.execute("""
         INSERT INTO item_scraps(item_id, component_id, quantity)
         VALUES (?,?,?)
         ON CONFLICT(item_id, component_id) 
         DO UPDATE SET quantity = excluded.quantity
     """, (item_id, component_id, qty))
+    return "updated" if row else "inserted"
+
+def prune_item_scraps(cur, item_id: int, keep_component_ids: set[int]) -> int:
+    """
+    Remove scrap links the wiki no longer lists for an item (a patch dropped a component)
+    - Goes through DELETE so the yield rollups and the change history triggers see it
+    Returns the number of links removed.
+    """
+    keep = sorted(keep_component_ids)
+    marks = ",".join("?" * len(keep))
+    cur.execute(f"DELETE FROM item_scraps WHERE item_id = ? AND component_id NOT IN ({marks})", (item_id, *keep))
+    return cur.rowcount
+
+def upsert_recipe(cur, name: str, kind: str, url: str | None) -> int:
+    """
+    Insert or Update a recipe by name, same flow as `upsert_item`
+    - The latest `kind` wins, the first known `url` is kept
+    """
+    cur.execute("""
+        INSERT INTO recipe(name, kind, url) VALUES (?,?,?)
+        ON CONFLICT(name)
+        DO UPDATE SET kind = excluded.kind, url = COALESCE(recipe.url, excluded.url)
+    """, (name, kind, url))
+    return cur.execute("SELECT id FROM recipe WHERE name = ?", (name,)).fetchone()[0]
+
+def set_recipe_ingredients(cur, recipe_id: int, ingredients: list[tuple[int, str]]):
+    """
+    Replace the ingredient list for a recipe
+    - `ingredients` uses the same (qty, name) shape `parse_components_cell` returns
+    - Old rows are cleared first so ingredients dropped from the wiki don't linger
+    """
+    cur.execute("DELETE FROM recipe_ingredient WHERE recipe_id = ?", (recipe_id,))
+    cur.executemany("""
+        INSERT INTO recipe_ingredient(recipe_id, ingredient, quantity)
+        VALUES (?,?,?)
+        ON CONFLICT(recipe_id, ingredient)
+        DO UPDATE SET quantity = quantity + excluded.quantity
+    """, [(recipe_id, name, qty) for qty, name in ingredients])
+
+def query_games(dbs: list[tuple[str, pathlib.Path]], sql: str, params: tuple = ()) -> list[tuple]:
+    """
+    Run the same query against several game databases in one go.
+    - `dbs` is [(game_key, path), ...]; the first opens as `main`, the rest are ATTACHed for this call only
+    - `sql` uses `{schema}` wherever a table needs qualifying, e.g. `FROM {schema}.item`
+    - The per-game queries are glued together with UNION ALL, and every row comes back
+      prefixed with its game key
+    """
+    (_, main_path), *others = dbs
+    conn = get_conn(main_path)
+    try:
+        schemas = ["main"]
+        for key, path in others:
+            schema = f"g_{key}"  # keys come from the games registry, never from user input
+            conn.execute("ATTACH DATABASE ? AS " + schema, (str(path),))
+            schemas.append(schema)
+        union = " UNION ALL ".join(
+            f"SELECT ? AS game, * FROM ({sql.format(schema=schema)})" for schema in schemas
+        )
+        bound = []
+        for key, _ in dbs:
+            bound.extend((key, *params))
+        return conn.execute(union, bound).fetchall()
+    finally:
+        conn.close()
 
 def fetch_all(db_path: pathlib.Path, sql: str, params: tuple = ()):
     with get_conn(db_path) as cx:
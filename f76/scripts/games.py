@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+# --- Dataset registry ---
+# One entry per game we keep scrap data for. Every game gets its own SQLite file with the same schema,
+# so a lookup only ever opens the one file it needs - the others are ATTACHed on demand by
+# cross-game commands like `f76 compare-scrap`.
+# Nothing in here imports the scrapers, so the CLI can read it without paying for requests/bs4.
+
+BASE = "https://fallout.fandom.com"
+
+@dataclass(frozen=True)
+class Game:
+    key: str                      # what you pass to --game
+    title: str
+    db_filename: str              # file name inside the data dir
+    junk_url: str                 # page holding the junk items table
+    junk_anchor: str = "#Junk_items"
+    locations_url: str | None = None   # regions/locations page, None if we don't scrape it
+    recipe_pages: tuple[tuple[str, str], ...] = ()  # (url, kind) pairs for the crafting scraper
+
+GAMES: dict[str, Game] = {
+    "fo76": Game(
+        key="fo76",
+        title="Fallout 76",
+        # the original single-game file name, so existing databases keep working
+        db_filename="fallout.sqlite",
+        junk_url=f"{BASE}/wiki/Fallout_76_junk_items",
+        locations_url=f"{BASE}/wiki/Fallout_76_locations",
+        recipe_pages=(
+            (f"{BASE}/wiki/Fallout_76_crafting", "craft"),
+            (f"{BASE}/wiki/Fallout_76_weapon_mods", "mod"),
+            (f"{BASE}/wiki/Fallout_76_armor_mods", "mod"),
+        ),
+    ),
+    "fo4": Game(
+        key="fo4",
+        title="Fallout 4",
+        db_filename="fallout4.sqlite",
+        junk_url=f"{BASE}/wiki/Fallout_4_junk_items",
+    ),
+}
+
+DEFAULT_GAME = "fo76"
+
+def get_game(key: str | None) -> Game:
+    """
+    Look up a game by key (case-insensitive), None means the default game.
+    Raises KeyError listing the known keys for anything else.
+    """
+    game = GAMES.get((key or DEFAULT_GAME).lower())
+    if game is None:
+        raise KeyError(f"Unknown game {key!r} - expected one of: {', '.join(GAMES)}")
+    return game
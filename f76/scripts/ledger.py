@@ -0,0 +1,145 @@
+import pathlib, sqlite3, statistics
+from collections import Counter
+from contextlib import closing, contextmanager
+from typing import Iterator
+
+from . import profiling
+from .db_utils import get_conn
+from .maintenance import maintain
+
+# --- Scrape ledger ---
+# Every scraper run is wrapped in `scrape_run(...)`, which
+#   1. writes a 'running' row to scrape_run up front (so a crashed run still shows up),
+#   2. collects per-page numbers in memory while the scraper works,
+#   3. writes the pages and the final status in one transaction when the run ends - ok or failed.
+# The ledger uses its own short-lived connections, opened only before and after the scraper's
+# own write transaction, so the two never wait on each other's lock.
+# A run that finishes ok is followed by a light maintenance pass (maintenance.py): sampled ANALYZE,
+# and VACUUM if the scrape left lots of free pages behind.
+
+# Thresholds for `regressions()` - a page is flagged when its latest fetch is this far off its recent median
+BYTES_RATIO = 2.0     # page size doubled, or halved
+ROWS_RATIO = 0.5      # parser found less than half the usual rows
+SLOW_RATIO = 3.0      # fetch took 3x longer than usual
+HISTORY = 5           # how many earlier fetches make up "usual"
+
+class Run:
+    def __init__(self, run_id: int):
+        self.id = run_id
+        self.pages: list[tuple] = []
+
+    def add_page(self, url: str, *, status: int | None = None, bytes: int | None = None,
+                 fetch_ms: float | None = None, parse_ms: float | None = None,
+                 counts: Counter | None = None, error: str | None = None):
+        """
+        Record one page. `counts` is a Counter keyed by 'inserted' / 'updated' / 'skipped'.
+        - The Counter is only read when the run ends, so a scraper can record a page
+          straight after fetching it and keep counting rows into the same Counter
+        """
+        self.pages.append((url, status, bytes, fetch_ms, parse_ms, counts if counts is not None else Counter(), error))
+
+    def add_fetched(self, page, counts: Counter | None = None):
+        """Record an `infra.Page` with the rows it produced"""
+        self.add_page(page.url, status=page.status, bytes=page.bytes,
+                      fetch_ms=page.fetch_ms, parse_ms=page.parse_ms, counts=counts)
+
+    def add_failed(self, url: str, error: BaseException):
+        """Record a fetch that raised - with the HTTP status if the server answered (a 404, a 503 after retries)"""
+        response = getattr(error, "response", None)
+        self.add_page(url, status=getattr(response, "status_code", None), error=f"{type(error).__name__}: {error}")
+
+    def rows(self) -> list[tuple]:
+        """The pages as scrape_page rows"""
+        return [(self.id, url, status, size, fetch_ms, parse_ms,
+                 counts["inserted"], counts["updated"], counts["skipped"], error)
+                for url, status, size, fetch_ms, parse_ms, counts, error in self.pages]
+
+@contextmanager
+def scrape_run(db_path: pathlib.Path, scraper: str) -> Iterator[Run]:
+    with closing(get_conn(db_path)) as conn, conn:
+        run_id = conn.execute("INSERT INTO scrape_run(scraper) VALUES (?)", (scraper,)).lastrowid
+    run = Run(run_id)
+    status, error = "ok", None
+    try:
+        yield run
+    except BaseException as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        with closing(get_conn(db_path)) as conn, conn:
+            conn.executemany("""
+                INSERT INTO scrape_page(run_id, url, http_status, bytes, fetch_ms, parse_ms,
+                                        rows_inserted, rows_updated, rows_skipped, error)
+                VALUES (?,?,?,?,?,?,?,?,?,?)
+            """, run.rows())
+            conn.execute("""
+                UPDATE scrape_run
+                SET finished_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now'), status = ?, error = ?
+                WHERE id = ?
+            """, (status, error, run_id))
+    # only reached when the scraper didn't raise
+    with profiling.stage("maintenance"):
+        try:
+            maintain(db_path, light=True)
+        except sqlite3.OperationalError:
+            pass  # e.g. another f76 holds the DB - housekeeping never fails a scrape, the next run will catch up
+
+# --- Reading it back ---
+def recent_runs(db_path: pathlib.Path, limit: int = 10) -> list[tuple]:
+    """
+    Newest runs first: (id, scraper, started_at, seconds, status, pages, bytes, inserted, updated, skipped)
+    """
+    q = """
+    SELECT r.id, r.scraper, r.started_at,
+           ROUND((julianday(r.finished_at) - julianday(r.started_at)) * 86400, 1) AS seconds,
+           r.status, COUNT(p.id), COALESCE(SUM(p.bytes), 0),
+           COALESCE(SUM(p.rows_inserted), 0), COALESCE(SUM(p.rows_updated), 0), COALESCE(SUM(p.rows_skipped), 0)
+    FROM scrape_run r
+    LEFT JOIN scrape_page p ON p.run_id = r.id
+    GROUP BY r.id
+    ORDER BY r.id DESC
+    LIMIT ?
+    """
+    with closing(get_conn(db_path)) as conn:
+        return conn.execute(q, (limit,)).fetchall()
+
+def regressions(db_path: pathlib.Path) -> list[tuple[str, str, str]]:
+    """
+    Compare each URL's latest successful fetch with the median of its previous `HISTORY` fetches.
+    Returns [(url, metric, "usual -> latest"), ...]
+    """
+    # ROW_NUMBER numbers each URL's fetches newest-first, so rn = 1 is the latest
+    # and rn 2..HISTORY+1 is the history it's compared with
+    q = """
+    SELECT url, rn, bytes, fetch_ms, rows_inserted + rows_updated + rows_skipped AS rows
+    FROM (
+      SELECT p.*, ROW_NUMBER() OVER (PARTITION BY p.url ORDER BY p.run_id DESC) AS rn
+      FROM scrape_page p
+      WHERE p.error IS NULL
+    )
+    WHERE rn <= ?
+    ORDER BY url, rn
+    """
+    with closing(get_conn(db_path)) as conn:
+        rows = conn.execute(q, (HISTORY + 1,)).fetchall()
+
+    by_url: dict[str, list[tuple]] = {}
+    for url, rn, size, fetch_ms, found in rows:
+        by_url.setdefault(url, []).append((size, fetch_ms, found))
+
+    flagged = []
+    for url, fetches in by_url.items():
+        (size, fetch_ms, found), history = fetches[0], fetches[1:]
+        if not history:
+            continue
+        usual_size = statistics.median(h[0] or 0 for h in history)
+        usual_ms = statistics.median(h[1] or 0 for h in history)
+        usual_rows = statistics.median(h[2] for h in history)
+        if usual_size and size and (size >= usual_size * BYTES_RATIO or size <= usual_size / BYTES_RATIO):
+            flagged.append((url, "bytes", f"{usual_size:,.0f} -> {size:,}"))
+        if usual_rows and found < usual_rows * ROWS_RATIO:
+            flagged.append((url, "rows", f"{usual_rows:,.0f} -> {found:,}"))
+        # cached pages have near-zero fetch times - only compare real fetches
+        if usual_ms and fetch_ms and usual_ms > 1 and fetch_ms >= usual_ms * SLOW_RATIO:
+            flagged.append((url, "fetch ms", f"{usual_ms:,.0f} -> {fetch_ms:,.0f}"))
+    return flagged
@@ -0,0 +1,105 @@
+import pathlib, sqlite3, time
+from contextlib import closing
+
+from .db_utils import get_conn
+
+# --- Database maintenance ---
+# Scrapes insert, update and delete rows all the time (lazy `where` lookups, crawler refreshes, re-scrapes),
+# and SQLite doesn't tidy up after itself:
+#
+# 🫧 Refresh - ANALYZE 🫧
+# The query planner picks indexes using statistics (row counts, how selective each index is)
+# stored in the sqlite_stat1 table. Nothing updates them automatically - without ANALYZE the planner
+# guesses, and a guess made when item_locations was empty is a bad one once it holds millions of rows.
+# `PRAGMA analysis_limit` makes ANALYZE sample a few hundred rows per index instead of reading them all.
+# (PRAGMA optimize would be the usual call here, but on the SQLite versions Python ships it only looks at
+# tables the *current* connection has queried - a fresh connection makes it a no-op.)
+# Docs: https://sqlite.org/lang_analyze.html, https://sqlite.org/pragma.html#pragma_analysis_limit
+#
+# 🫧 Refresh - Free pages & VACUUM 🫧
+# Deleted rows leave their pages on a "freelist" for reuse; the file never shrinks by itself
+# and live rows end up scattered. VACUUM rewrites the whole database into a fresh, packed file.
+# That's a full copy, so it only runs when enough of the file is free to be worth it.
+# Docs: https://sqlite.org/lang_vacuum.html
+#
+# 🫧 Refresh - Consistency checks 🫧
+# `PRAGMA foreign_key_check` lists rows whose REFERENCES point at nothing (e.g. written while foreign keys were off).
+# `PRAGMA integrity_check` walks every page, index and constraint; `quick_check` skips the slow index-vs-table comparison.
+# Docs: https://sqlite.org/pragma.html#pragma_integrity_check
+
+VACUUM_FREE_RATIO = 0.25      # compact when more than a quarter of the file is free pages...
+VACUUM_MIN_FREE_PAGES = 256   # ...and at least this many (1 MiB at the default 4 KiB page) - less isn't worth a rewrite
+LIGHT_ANALYSIS_LIMIT = 400    # rows sampled per index by the post-scrape ANALYZE
+PROBLEM_LIMIT = 20            # integrity_check messages to keep
+
+def _space(conn: sqlite3.Connection) -> tuple[int, int, int]:
+    """(page_size, page_count, freelist_count)"""
+    return tuple(conn.execute(f"PRAGMA {p}").fetchone()[0] for p in ("page_size", "page_count", "freelist_count"))
+
+def needs_vacuum(page_count: int, free_pages: int) -> bool:
+    return free_pages >= VACUUM_MIN_FREE_PAGES and free_pages > page_count * VACUUM_FREE_RATIO
+
+def _foreign_key_problems(conn: sqlite3.Connection) -> list[str]:
+    # one row per orphan: (table, rowid, parent, fk index) - summed up per table/parent pair
+    counts: dict[tuple[str, str], int] = {}
+    for table, _, parent, _ in conn.execute("PRAGMA foreign_key_check"):
+        counts[table, parent] = counts.get((table, parent), 0) + 1
+    return [f"{table} -> {parent}: {n:,} row(s) point at a missing {parent}" for (table, parent), n in counts.items()]
+
+def maintain(db_path: pathlib.Path, *, light: bool = False, vacuum: bool | None = None, quick: bool = False) -> dict:
+    """
+    Refresh planner statistics, check the database and compact it if it's worth it.
+    - `light` is the post-scrape pass: sampled ANALYZE and compaction only, no checks
+    - `vacuum` True always compacts, False never does, None compacts past the free-page threshold
+    - `quick` runs quick_check instead of the full integrity_check
+    Returns {"steps": [(name, seconds, result)], "problems": [...], "bytes_before": ..., "bytes_after": ...}
+    """
+    steps: list[tuple[str, float, str]] = []
+    problems: list[str] = []
+
+    def step(name: str, run) -> None:
+        start = time.perf_counter()
+        result = run()
+        steps.append((name, time.perf_counter() - start, result))
+
+    with closing(get_conn(db_path)) as conn:
+        page_size, page_count, free_pages = _space(conn)
+        bytes_before = page_size * page_count
+
+        def analyze() -> str:
+            conn.execute(f"PRAGMA analysis_limit = {LIGHT_ANALYSIS_LIMIT if light else 0}")
+            conn.execute("ANALYZE")
+            conn.commit()
+            (indexes,) = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()
+            return f"{indexes} index stats" + (f" (sampled {LIGHT_ANALYSIS_LIMIT} rows each)" if light else "")
+        step("analyze", analyze)
+
+        if not light:
+            def foreign_keys() -> str:
+                found = _foreign_key_problems(conn)
+                problems.extend(found)
+                return "ok" if not found else f"{len(found)} problem(s)"
+            step("foreign key check", foreign_keys)
+
+            def integrity() -> str:
+                pragma = "quick_check" if quick else "integrity_check"
+                found = [msg for (msg,) in conn.execute(f"PRAGMA {pragma}({PROBLEM_LIMIT})") if msg != "ok"]
+                problems.extend(found)
+                return "ok" if not found else f"{len(found)} problem(s)"
+            step("quick check" if quick else "integrity check", integrity)
+
+        free = f"{free_pages:,} of {page_count:,} pages free"
+        if problems:
+            # rewriting a damaged file can make it worse - fix the problems first
+            steps.append(("vacuum", 0.0, f"skipped - {free}, but the checks found problems"))
+        elif vacuum or (vacuum is None and needs_vacuum(page_count, free_pages)):
+            def compact() -> str:
+                conn.execute("VACUUM")
+                return f"compacted - {free} before"
+            step("vacuum", compact)
+        else:
+            steps.append(("vacuum", 0.0, f"skipped - {free}"))
+
+        page_size, page_count, _ = _space(conn)
+        return {"steps": steps, "problems": problems,
+                "bytes_before": bytes_before, "bytes_after": page_size * page_count}
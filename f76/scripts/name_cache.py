@@ -0,0 +1,118 @@
+import mmap, os, pathlib, sqlite3
+
+# --- Name cache for shell completion ---
+# Tab completion runs the CLI once per keypress, so it has to answer fast and can't
+# afford to open SQLite every time. Instead the scrapers write every name we'd want to
+# complete into one small sorted text file next to the DB:
+#
+#   <kind>\t<casefolded name>\t<name>\n
+#
+# Because the lines are sorted, every name starting with a prefix sits in one contiguous run,
+# and we can find the start of that run with a binary search - O(log n) line reads,
+# ~17 for 100k names - straight off a memory-mapped file, without reading the rest of it.
+# Docs: https://docs.python.org/3/library/mmap.html
+
+# kind -> SQL that lists its names
+KINDS = {
+    "item": "SELECT name FROM item",
+    "component": "SELECT name FROM component",
+    "location": "SELECT name FROM location",
+    "region": "SELECT name FROM region",
+    "recipe": "SELECT name FROM recipe",
+}
+
+def cache_path(db_path: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(db_path).with_suffix(".names")
+
+def _line(kind: str, name: str) -> bytes:
+    return f"{kind}\t{name.casefold()}\t{name}\n".encode("utf-8")
+
+def write_name_cache(conn: sqlite3.Connection, db_path: pathlib.Path) -> pathlib.Path:
+    """
+    Rewrite the completion cache for `db_path` from the current DB contents.
+    Called by the scrapers after they change names; the write is atomic (temp file + rename)
+    so a completion running at the same time never sees half a file.
+    """
+    lines = set()
+    for kind, sql in KINDS.items():
+        try:
+            names = conn.execute(sql).fetchall()
+        except sqlite3.OperationalError:
+            continue  # no such table - a DB from before that kind existed, and not migrated yet
+        for (name,) in names:
+            # names are cleaned by the scrapers, but never let a stray tab/newline break the format
+            name = " ".join(name.split())
+            if name:
+                lines.add(_line(kind, name))
+    path = cache_path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".names.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.writelines(sorted(lines))
+    tmp.replace(path)
+    return path
+
+def _line_at(buf: mmap.mmap, pos: int) -> tuple[int, int]:
+    """Start and end (exclusive, without the newline) of the line containing byte `pos`"""
+    start = buf.rfind(b"\n", 0, pos) + 1
+    end = buf.find(b"\n", pos)
+    return start, (len(buf) if end == -1 else end)
+
+def _build_missing(db_path: pathlib.Path) -> bool:
+    """
+    Write the cache for a DB that has none yet (one made before the cache existed, or copied in by hand).
+    Read-only: no migrations, no writes to the DB - just one pass over the name columns, once.
+    """
+    db_path = pathlib.Path(db_path)
+    if not db_path.exists():
+        return False
+    try:
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            write_name_cache(conn, db_path)
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        return False
+    return True
+
+def complete_names(db_path: pathlib.Path, kind: str, prefix: str, limit: int = 50) -> list[str]:
+    """
+    Names of `kind` starting with `prefix` (case-insensitive), in sorted order.
+    Only reads the cache - except the first time, when a DB without one gets it built.
+    """
+    path = cache_path(db_path)
+    try:
+        f = open(path, "rb")
+    except OSError:
+        if not _build_missing(db_path):
+            return []
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return []
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            target = f"{kind}\t{prefix.casefold()}".encode("utf-8")
+            # Binary search on byte offsets for the first line >= target
+            lo, hi = 0, len(buf)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                start, end = _line_at(buf, mid)
+                if buf[start:end] < target:
+                    lo = end + 1
+                else:
+                    hi = start
+            # Walk forward through the contiguous run of matches
+            out = []
+            pos = lo
+            while pos < len(buf) and len(out) < limit:
+                start, end = _line_at(buf, pos)
+                line = buf[start:end]
+                if not line.startswith(target):
+                    break
+                out.append(line.rsplit(b"\t", 1)[1].decode("utf-8"))
+                pos = end + 1
+            return out
@@ -0,0 +1,215 @@
+import contextlib, json, os, pathlib, sqlite3, threading, time, tracemalloc
+
+# --- Profiling & tracing ---
+# Turned on by `f76 --profile ...` or the F76_TRACE env var, off otherwise.
+# When off, every hook below is a single `is None` check on a module global:
+#   - stage() hands back one shared nullcontext
+#   - add_bytes() returns straight away
+#   - connect() returns a plain sqlite3.Connection (no timing wrappers at all)
+# When on, we collect per-stage wall time, bytes fetched, rows written, per-SQL-statement timings
+# and peak memory (tracemalloc), and can dump a cProfile file and/or a Chrome trace.
+#
+# Chrome trace files open in chrome://tracing or https://ui.perfetto.dev
+# Format docs: https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+
+_trace: "Trace | None" = None
+_NULL = contextlib.nullcontext()
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLAC")   # statement prefixes whose rowcount is rows written
+
+class Trace:
+    def __init__(self, chrome_path: pathlib.Path | None = None):
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stages: dict[str, list[float]] = {}   # name -> [calls, seconds]
+        self.sql: dict[str, list[float]] = {}      # statement -> [calls, seconds, rows]
+        self.bytes_fetched = 0
+        self.rows_written = 0
+        self.chrome_path = chrome_path
+        self.events: list[dict] = []
+
+    def _event(self, name: str, cat: str, start: float, end: float):
+        if self.chrome_path is not None:
+            self.events.append({
+                "name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": (start - self.t0) * 1e6, "dur": (end - start) * 1e6,
+            })
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                calls_secs = self.stages.setdefault(name, [0, 0.0])
+                calls_secs[0] += 1
+                calls_secs[1] += end - start
+                self._event(name, "stage", start, end)
+
+    def record_sql(self, sql: str, start: float, end: float, rows: int):
+        key = " ".join(sql.split())
+        with self.lock:
+            stats = self.sql.setdefault(key, [0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += end - start
+            stats[2] += max(rows, 0)
+            if rows > 0 and key[:6].upper() in _WRITES:
+                self.rows_written += rows
+            self._event(key[:80], "sql", start, end)
+
+    def record_fetch(self, sql: str, start: float, end: float, rows: int, written: int = 0, seconds: float | None = None):
+        # a fetch belongs to the execute() already recorded for `sql`: add its time and rows, not another call
+        # (`seconds` when the time wasn't one stretch from start to end - rows pulled one by one while iterating)
+        key = " ".join(sql.split())
+        with self.lock:
+            stats = self.sql.setdefault(key, [0, 0.0, 0])
+            stats[1] += end - start if seconds is None else seconds
+            stats[2] += rows
+            self.rows_written += written
+            self._event(key[:80], "sql fetch", start, end)
+
+# --- Public hooks ---
+def enabled() -> bool:
+    return _trace is not None
+
+def enable(chrome_path: pathlib.Path | None = None) -> Trace:
+    global _trace
+    _trace = Trace(chrome_path)
+    tracemalloc.start()
+    return _trace
+
+def stage(name: str):
+    """`with stage("fetch"): ...` - times the block when profiling is on, does nothing otherwise"""
+    return _NULL if _trace is None else _trace.stage(name)
+
+def add_bytes(n: int):
+    if _trace is not None:
+        with _trace.lock:
+            _trace.bytes_fetched += n
+
+# --- SQL timing ---
+# sqlite3 lets us pick the Connection class with `factory=`. The traced one hands out traced cursors,
+# and its execute()/executemany() shortcuts are routed through them, so every statement gets timed.
+# Time is counted for execute, fetch*() and iterating the cursor (`for row in cur`, how f76.api reads results).
+class TracedCursor(sqlite3.Cursor):
+    _last_sql = ""
+    # rows pulled by iteration since the last flush: count, seconds spent in SQLite, when the first one was asked for
+    _iter_rows = 0
+    _iter_secs = 0.0
+    _iter_start: float | None = None
+
+    def _timed(self, method, sql, *args):
+        self._flush_iter()  # a new statement ends the previous one's iteration
+        start = time.perf_counter()
+        try:
+            return method(sql, *args)
+        finally:
+            self._last_sql = sql
+            if _trace is not None:
+                _trace.record_sql(sql, start, time.perf_counter(), self.rowcount)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def _timed_fetch(self, method, *args):
+        before = max(self.rowcount, 0)
+        start = time.perf_counter()
+        result = method(*args)
+        if _trace is not None:
+            # fetched rows are counted for the report. Rows written only grow by what SQLite reports on top of
+            # execute() - for INSERT ... RETURNING the rowcount catches up as the rows are fetched
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+            written = max(self.rowcount - before, 0) if self._last_sql.lstrip()[:6].upper() in _WRITES else 0
+            _trace.record_fetch(self._last_sql, start, time.perf_counter(), rows, written)
+        return result
+
+    # 🫧 Refresh - the iterator protocol 🫧
+    # `for row in cur` calls iter(cur) once, then next() until it raises StopIteration.
+    # Each row is timed here, but the totals only go to the trace in one go - when the rows run out,
+    # the cursor runs another statement or is closed - so a big SELECT isn't thousands of trace entries.
+    # Docs: https://docs.python.org/3/library/stdtypes.html#iterator-types
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._flush_iter()
+            raise
+        if self._iter_start is None:
+            self._iter_start = start
+        self._iter_rows += 1
+        self._iter_secs += time.perf_counter() - start
+        return row
+
+    def _flush_iter(self):
+        if self._iter_start is not None and _trace is not None:
+            _trace.record_fetch(self._last_sql, self._iter_start, time.perf_counter(), self._iter_rows,
+                                seconds=self._iter_secs)
+        self._iter_rows, self._iter_secs, self._iter_start = 0, 0.0, None
+
+    def close(self):
+        self._flush_iter()
+        super().close()
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+class TracedConnection(sqlite3.Connection):
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def connect(path) -> sqlite3.Connection:
+    """Drop-in for sqlite3.connect - returns a timing connection only while profiling"""
+    if _trace is None:
+        return sqlite3.connect(path)
+    return sqlite3.connect(path, factory=TracedConnection)
+
+# --- Reporting ---
+def report(console, top: int = 10):
+    """Print the collected numbers as tables on `console` (stages and SQL sorted slowest first)"""
+    from rich.table import Table
+    if _trace is None:
+        return
+    total = time.perf_counter() - _trace.t0
+    _, peak = tracemalloc.get_traced_memory()
+
+    console.print(f"[bold]Profile[/bold] total {total * 1000:.1f} ms, fetched {_trace.bytes_fetched:,} bytes, "
+                  f"wrote {_trace.rows_written:,} rows, peak traced memory {peak / 1024 / 1024:.1f} MiB")
+    t = Table(title="Stages", show_lines=False)
+    t.add_column("Stage"); t.add_column("Calls", justify="right"); t.add_column("ms", justify="right")
+    for name, (calls, secs) in sorted(_trace.stages.items(), key=lambda kv: -kv[1][1]):
+        t.add_row(name, str(calls), f"{secs * 1000:.1f}")
+    console.print(t)
+
+    if _trace.sql:
+        t = Table(title=f"Top {top} SQL statements", show_lines=False)
+        t.add_column("Statement", overflow="fold"); t.add_column("Calls", justify="right")
+        t.add_column("Rows", justify="right"); t.add_column("ms", justify="right")
+        ranked = sorted(_trace.sql.items(), key=lambda kv: -kv[1][1])[:top]
+        for sql, (calls, secs, rows) in ranked:
+            t.add_row(sql[:120], str(calls), str(rows), f"{secs * 1000:.1f}")
+        console.print(t)
+
+def write_chrome_trace():
+    if _trace is None or _trace.chrome_path is None:
+        return
+    _trace.chrome_path.write_text(json.dumps({"traceEvents": _trace.events}), encoding="utf-8")
@@ -0,0 +1,176 @@
+import pathlib, sqlite3
+from collections import Counter
+from bs4 import BeautifulSoup, Tag
+
+from .infra import db_conn, resolve_db_path, fetch_page, make_session
+from ..parsing_utils import clean_text, parse_components_cell
+from ..name_cache import write_name_cache
+from ..db_utils import ensure_schema, upsert_recipe, set_recipe_ingredients
+from ..games import BASE, Game, get_game
+from ..ledger import Run, scrape_run
+
+# Recipe pages come from the game's `recipe_pages` (games.py): every va-table on them with a
+# Name column and a Components/Materials/Ingredients column is read as a list of recipes
+
+INGREDIENT_HEADERS = ("component", "material", "ingredient")
+
+def _is_recipe_table(tag: Tag) -> bool:
+    return tag.name == "table" and "va-table" in tag.get("class", [])
+
+def _parse_recipe_table(table: Tag) -> list[tuple[str, str | None, list[tuple[int, str]]]]:
+    """
+    Returns: list[(recipe_name, url, [(qty, ingredient_name), ...])]
+    Tables without the expected headers return an empty list.
+    """
+    rows = table.select("tr")
+    if not rows:
+        return []
+    header_cells = rows[0].find_all(["th", "td"])
+    headers = [clean_text(h.get_text(" ", strip=True)).lower() for h in header_cells]
+    try:
+        name_idx = next(i for i, h in enumerate(headers) if h.startswith("name"))
+        ingr_idx = next(i for i, h in enumerate(headers) if any(k in h for k in INGREDIENT_HEADERS))
+    except StopIteration:
+        return []
+
+    out = []
+    for row in rows[1:]:
+        tds = row.find_all(["td", "th"])
+        if len(tds) <= max(name_idx, ingr_idx):
+            continue
+        name_cell = tds[name_idx]
+        a = name_cell.find("a")
+        name = clean_text(a.get_text() if a else name_cell.get_text())
+        if not name:
+            continue
+        url = None
+        if a and a.has_attr("href"):
+            url = a["href"]
+            if url.startswith("/"):
+                url = BASE + url
+        ingredients = parse_components_cell(tds[ingr_idx])
+        if ingredients:
+            out.append((name, url, ingredients))
+    return out
+
+# --- Recipe closure ---
+# A recipe can ask for another recipe (e.g. a stew that needs Purified water),
+# so answering "what raw materials does this need?" is a walk down a tree.
+# Walking it on every `f76 craft` call would re-expand the same sub-recipes over and over,
+# so instead the whole tree is expanded once here and stored in `recipe_material`.
+#
+# 🫧 Refresh - Memoization 🫧
+# Cache the answer for each input the first time it's computed, reuse it after that.
+# Every recipe is expanded exactly once no matter how many other recipes use it,
+# so the total work is O(recipes + ingredient links) instead of O(size of every tree)
+# (recipes caught up in a wiki cycle are the exception - they're re-walked from each entry point)
+# Docs: https://docs.python.org/3/library/functools.html#functools.cache
+def rebuild_recipe_materials(conn: sqlite3.Connection) -> int:
+    """
+    Recompute `recipe_material` from `recipe_ingredient`.
+    - Component names are always raw (never expanded, even if a recipe shares the name)
+    - Ingredients that are neither a component nor a recipe are treated as raw too
+    - Cycles on the wiki (A needs B needs A) are cut at the repeat, which is treated as raw
+    - Materials are matched case-insensitively ('Steel' and 'steel' are one material),
+      and written under the component's name when there is one
+    Returns the number of closure rows written.
+    """
+    recipes = {name.lower(): rid for rid, name in conn.execute("SELECT id, name FROM recipe")}
+    components = {name.lower(): name for (name,) in conn.execute("SELECT name FROM component")}
+    ingredients: dict[int, list[tuple[str, int]]] = {}
+    # lowercased material -> the name written to recipe_material: the component's name, else the first spelling seen
+    display: dict[str, str] = {}
+    for rid, ingredient, qty in conn.execute(
+            "SELECT recipe_id, ingredient, quantity FROM recipe_ingredient ORDER BY recipe_id, ingredient"):
+        ingredients.setdefault(rid, []).append((ingredient, qty))
+        display.setdefault(ingredient.lower(), ingredient)
+    display.update(components)
+
+    memo: dict[int, Counter] = {}
+    visiting: set[int] = set()
+
+    def expand(rid: int) -> tuple[Counter, set[int]]:
+        """
+        (lowercased material -> qty, recipes cut because they were already being expanded)
+        A result that cut a cycle depends on where the walk came in, so it isn't memoized
+        """
+        if rid in memo:
+            return memo[rid], set()
+        visiting.add(rid)
+        total: Counter = Counter()
+        cut: set[int] = set()
+        for ingredient, qty in ingredients.get(rid, []):
+            key = ingredient.lower()
+            sub = recipes.get(key)
+            if key in components or sub is None:
+                total[key] += qty
+                continue
+            if sub in visiting:
+                total[key] += qty
+                cut.add(sub)
+                continue
+            sub_total, sub_cut = expand(sub)
+            cut |= sub_cut
+            for material, sub_qty in sub_total.items():
+                total[material] += qty * sub_qty
+        visiting.discard(rid)
+        if not cut:
+            memo[rid] = total
+        return total, cut
+
+    conn.execute("DELETE FROM recipe_material")
+    written = 0
+    for rid in recipes.values():
+        rows = [(rid, display[material], qty) for material, qty in expand(rid)[0].items()]
+        conn.executemany("INSERT INTO recipe_material(recipe_id, material, quantity) VALUES (?,?,?)", rows)
+        written += len(rows)
+    return written
+
+def main(db_path: str | pathlib.Path | None = None, game: Game | None = None):
+    game = game or get_game(None)
+    if not game.recipe_pages:
+        print(f"No recipe pages registered for {game.title}, skipping.")
+        return
+    # every run is recorded in the scrape ledger (`f76 stats`), failed ones included
+    with scrape_run(resolve_db_path(db_path), "crafting_recipes") as run:
+        _load_recipes(db_path, game, run)
+
+def _load_recipes(db_path: str | pathlib.Path | None, game: Game, run: Run):
+    session = make_session()
+    # (name, kind, url, ingredients, Counter of the page it came from)
+    parsed: list[tuple[str, str, str | None, list[tuple[int, str]], Counter]] = []
+    for url, kind in game.recipe_pages:
+        try:
+            page = fetch_page(url, session=session)
+        except Exception as e:
+            run.add_failed(url, e)  # so the failed run still says which page and why
+            raise
+        counts = Counter()
+        run.add_fetched(page, counts)
+        for table in page.soup.find_all(_is_recipe_table):
+            for name, recipe_url, ingredients in _parse_recipe_table(table):
+                parsed.append((name, kind, recipe_url, ingredients, counts))
+
+    if not parsed:
+        raise RuntimeError("Couldn't find any recipe tables")
+
+    # Open DB and ensure schema
+    with db_conn(db_path, ensure_schema_fn=ensure_schema) as conn:
+        with conn:
+            cur = conn.cursor()
+            known = {name for (name,) in cur.execute("SELECT name FROM recipe")}
+            for name, kind, recipe_url, ingredients, counts in parsed:
+                # recipes are rewritten every run, so they're either new or updated
+                counts["updated" if name in known else "inserted"] += 1
+                known.add(name)
+                recipe_id = upsert_recipe(cur, name, kind, recipe_url)
+                set_recipe_ingredients(cur, recipe_id, ingredients)
+            closure_rows = rebuild_recipe_materials(conn)
+
+        # keep shell completion in step with the names we just loaded
+        write_name_cache(conn, resolve_db_path(db_path))
+
+    print(f"Loaded {len(parsed)} recipes expanded into {closure_rows} raw material links.")
+
+if __name__ == "__main__":
+    main()
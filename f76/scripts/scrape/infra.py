@@ -1,15 +1,25 @@
+import hashlib
 import os
 import pathlib
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import Iterator, Optional
 
 import requests
 from bs4 import BeautifulSoup
 
+from .. import profiling
+from ..db_utils import stamp_history
+from .throttle import AdaptiveConcurrency, ThrottledSession
+
 DEFAULT_USER_AGENT = "ash-sql-learning/0.1 (personal, low-traffic)"
 DEFAULT_HEADERS = {"User-Agent": DEFAULT_USER_AGENT}
 DEFAULT_TIMEOUT = 30
+# Cached pages older than this are fetched again
+DEFAULT_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # one week, in seconds
 
 # --- DB Path Resolution --- 
 # This path will change if we move this module
@@ -44,20 +54,26 @@ def resolve_db_path(db_path: str | pathlib.Path | None) -> pathlib.Path:
 # and what happens when we leave it, even if there's an error"
 # JS Dev speak: "Like a try/finally, or a helper that guarantees cleanup"
 @contextmanager
-def db_conn(db_path: str | pathlib.Path | None = None, *, ensure_schema_fn=None) -> Iterator[sqlite3.Connection]:
+def db_conn(db_path: str | pathlib.Path | None = None, *, ensure_schema_fn=None,
+            run_id: int | None = None) -> Iterator[sqlite3.Connection]:
     """
     Opens SQLite connection at the resolved path & ensures parent dir exists.
     Calls ensure_schema (opt) before yielding
+    - `run_id` (the ledger run doing the writing) is stamped on every history row the writes produce
     """
     path = resolve_db_path(db_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(path)
+    conn = profiling.connect(path)
     conn.execute("PRAGMA foreign_keys=ON;")
     try:
         if ensure_schema_fn is not None:
             ensure_schema_fn(conn)
+        if run_id is not None:
+            stamp_history(conn, run_id)
         yield conn
+        if run_id is not None:
+            stamp_history(conn, None)  # cleared in the same transaction, so the stamp never outlives it
         conn.commit()
     except Exception:
         conn.rollback()
@@ -66,15 +82,82 @@ def db_conn(db_path: str | pathlib.Path | None = None, *, ensure_schema_fn=None)
         conn.close()
 
 # --- HTTP Helpers ---
-def make_session(headers: Optional[dict] = None) -> requests.Session:
-    s = requests.Session()
+def make_session(headers: Optional[dict] = None, *, concurrency: Optional[AdaptiveConcurrency] = None) -> requests.Session:
+    """
+    A session that rate limits, retries transient failures and keeps a pool of connections (see throttle.py)
+    - Pass an `AdaptiveConcurrency` to also cap requests in flight across threads sharing the session
+    """
+    s = ThrottledSession(concurrency)
     s.headers.update(DEFAULT_HEADERS if headers is None else headers)
     return s
 
-def fetch_soup(url: str, *, session: Optional[requests.Session] = None, timeout: int = DEFAULT_TIMEOUT, parser: str = "html.parser") -> BeautifulSoup:
+def default_cache_dir(db_path: str | pathlib.Path | None = None) -> pathlib.Path:
+    # Page cache lives next to the DB it feeds
+    return resolve_db_path(db_path).parent / "cache" / "pages"
+
+def _cache_file(cache_dir: pathlib.Path, url: str) -> pathlib.Path:
+    # URLs make bad file names - hash them into a fixed-length, filesystem-safe key
+    return cache_dir / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html")
+
+@dataclass
+class Page:
+    """
+    A fetched + parsed page, with the numbers the scrape ledger records
+    - `status` is None when the page came from the cache
+    """
+    url: str
+    soup: BeautifulSoup
+    status: Optional[int]
+    bytes: int
+    fetch_ms: float
+    parse_ms: float
+
+def _get(url: str, *, session: Optional[requests.Session], timeout: int,
+         cache_dir: Optional[pathlib.Path], max_age: float) -> tuple[str, Optional[int], int]:
+    """
+    GET a page: returns (html, http status or None if cached, size in bytes).
+    - With a `cache_dir`, a fresh-enough cached copy is returned without touching the network,
+      and successful responses are written to the cache for next time
+    """
+    cached = _cache_file(cache_dir, url) if cache_dir is not None else None
+    if cached is not None and cached.exists() and time.time() - cached.stat().st_mtime < max_age:
+        with profiling.stage("cache read"):
+            text = cached.read_text(encoding="utf-8")
+        return text, None, len(text.encode("utf-8"))
+
     # allow passed active session, or create a new one
     s = session or make_session()
-    resp = s.get(url, timeout=timeout)
-    resp.raise_for_status()
-    # Return HTML for parsing 
-    return BeautifulSoup(resp.text, parser)
+    with profiling.stage("fetch"):
+        resp = s.get(url, timeout=timeout)
+        resp.raise_for_status()
+        text = resp.text
+    profiling.add_bytes(len(resp.content))
+
+    if cached is not None:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so a crash mid-write never leaves a truncated page in the cache
+        tmp = cached.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(cached)
+    return text, resp.status_code, len(resp.content)
+
+def fetch_text(url: str, *, session: Optional[requests.Session] = None, timeout: int = DEFAULT_TIMEOUT,
+               cache_dir: Optional[pathlib.Path] = None, max_age: float = DEFAULT_CACHE_MAX_AGE) -> str:
+    """GET a page and return its HTML (see `_get` for caching)"""
+    return _get(url, session=session, timeout=timeout, cache_dir=cache_dir, max_age=max_age)[0]
+
+def fetch_page(url: str, *, session: Optional[requests.Session] = None, timeout: int = DEFAULT_TIMEOUT, parser: str = "html.parser",
+               cache_dir: Optional[pathlib.Path] = None, max_age: float = DEFAULT_CACHE_MAX_AGE) -> Page:
+    """Fetch and parse a page, timing each half"""
+    start = time.perf_counter()
+    text, status, size = _get(url, session=session, timeout=timeout, cache_dir=cache_dir, max_age=max_age)
+    fetched = time.perf_counter()
+    with profiling.stage("parse"):
+        soup = BeautifulSoup(text, parser)
+    parsed = time.perf_counter()
+    return Page(url, soup, status, size, (fetched - start) * 1000, (parsed - fetched) * 1000)
+
+def fetch_soup(url: str, *, session: Optional[requests.Session] = None, timeout: int = DEFAULT_TIMEOUT, parser: str = "html.parser",
+               cache_dir: Optional[pathlib.Path] = None) -> BeautifulSoup:
+    # Return HTML for parsing
+    return fetch_page(url, session=session, timeout=timeout, parser=parser, cache_dir=cache_dir).soup
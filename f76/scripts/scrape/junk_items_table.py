@@ -1,24 +1,39 @@
 import pathlib
+from collections import Counter
 from bs4 import BeautifulSoup
 # Note: when Python runs a file, it will compile it into bytecode (.pyc files)
 # This makes it faster to load these modules next time. Compiled files live in `__pycache__`
-from .infra import db_conn, fetch_soup
+from .infra import db_conn, resolve_db_path, fetch_page
 from ..parsing_utils import clean_text, has_all_classes, parse_components_cell
-from ..db_utils import ensure_schema, upsert_component, upsert_item, set_item_scrap
+from ..name_cache import write_name_cache
+from ..db_utils import ensure_schema, prune_item_scraps, stamped, upsert_component, upsert_item, set_item_scrap
+from ..games import Game, get_game
+from ..ledger import Run, scrape_run
 
-URL = "https://fallout.fandom.com/wiki/Fallout_76_junk_items"
+def main(db_path: str | pathlib.Path | None = None, game: Game | None = None):
+    game = game or get_game(None)
+    # every run is recorded in the scrape ledger (`f76 stats`), failed ones included
+    with scrape_run(resolve_db_path(db_path), "junk_items") as run:
+        _load_junk_items(db_path, game, run)
 
-def main(db_path: str | pathlib.Path | None = None):
-    soup: BeautifulSoup = fetch_soup(URL)
+def _load_junk_items(db_path: str | pathlib.Path | None, game: Game, run: Run):
+    try:
+        page = fetch_page(game.junk_url)
+    except Exception as e:
+        run.add_failed(game.junk_url, e)  # so the failed run still says which page and why
+        raise
+    soup: BeautifulSoup = page.soup
+    counts = Counter()  # item_scraps links: inserted / updated / skipped
+    run.add_fetched(page, counts)  # counts keeps filling below, the ledger reads it when the run ends
 
     # Find the "Junk Items" table 
-    anchor = soup.select_one("#Junk_items")
+    anchor = soup.select_one(game.junk_anchor)
     if not anchor:
-        raise SystemExit("Couldn't find #Junk_items anchor")
+        raise SystemExit(f"Couldn't find {game.junk_anchor} anchor")
     
     h3 = anchor.find_parent("h3")
     if not h3:
-        raise RuntimeError("Could not find parent <h3> for #Junk_items")
+        raise RuntimeError(f"Could not find parent <h3> for {game.junk_anchor}")
     
     table = h3.find_next(has_all_classes)
     if not table:
@@ -34,6 +49,8 @@ def main(db_path: str | pathlib.Path | None = None):
         raise SystemExit(f"Unexpected headers: {headers}")
     
     total_items, total_links = 0, 0
+    # components seen per item this run - an item listed on two rows keeps both rows' components
+    seen: dict[int, set[int]] = {}
 
     # Open DB and ensure schema
     with db_conn(db_path, ensure_schema_fn=ensure_schema) as conn:
@@ -60,16 +77,22 @@ def main(db_path: str | pathlib.Path | None = None):
             if not comps:
                 continue
 
-            with conn:
+            with stamped(conn, run.id):
                 cur = conn.cursor()
                 item_id = upsert_item(cur, name, url)
                 for qty, comp_name in comps:
                     comp_id = upsert_component(cur, comp_name)
-                    set_item_scrap(cur, item_id, comp_id, qty)
+                    counts[set_item_scrap(cur, item_id, comp_id, qty)] += 1
+                    seen.setdefault(item_id, set()).add(comp_id)
                     total_links += 1
+                # components the wiki dropped go too, so history records the removal (the ledger counts it as an update)
+                counts["updated"] += prune_item_scraps(cur, item_id, seen[item_id])
             total_items += 1
 
-    print(f"Loaded {total_items} junk items with {total_links} component links.")
+        # keep shell completion in step with the names we just loaded
+        write_name_cache(conn, resolve_db_path(db_path))
+
+    print(f"Loaded {total_items} {game.title} junk items with {total_links} component links.")
 
 if __name__ == "__main__":
     main()
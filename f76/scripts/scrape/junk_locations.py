@@ -1,9 +1,12 @@
 
 import pathlib
+from collections import Counter
 from bs4 import BeautifulSoup, Tag
 
-from .infra import db_conn, fetch_soup
+from .infra import db_conn, fetch_page, resolve_db_path
 from ..parsing_utils import clean_text
+from ..db_utils import ensure_schema, intern_description
+from ..ledger import Run, scrape_run
 
 BASE = "https://fallout.fandom.com"
 
@@ -63,12 +66,14 @@ def _lookup_item(cur, item_name:str):
     ).fetchone()
     return row
 
-def _has_item_location(cur, item_id: int) -> bool:
-    (cnt,) = cur.execute(
-        "SELECT COUNT(*) FROM item_locations WHERE item_id = ?",
+def _item_page_scraped(cur, item_id: int) -> bool:
+    # item_crawl, not item_locations: the location crawler adds rows for an item too,
+    # but only for the locations it crawled - the item's own page may list more
+    row = cur.execute(
+        "SELECT 1 FROM item_crawl WHERE item_id = ?",
         (item_id,)
     ).fetchone()
-    return cnt > 0
+    return row is not None
 
 def _lookup_location_id_by_name(cur, name: str) -> int | None:
     row = cur.execute(
@@ -77,14 +82,16 @@ def _lookup_location_id_by_name(cur, name: str) -> int | None:
     ).fetchone()
     return row[0] if row else None
 
-def _insert_item_location(cur, item_id: int, location_id: int, description: str | None, quantity: int | None):
+def _insert_item_location(cur, item_id: int, location_id: int, description_id: int, quantity: int | None) -> str:
     cur.execute(
         """
-        INSERT OR IGNORE INTO item_locations(item_id, location_id,description, quantity)
+        INSERT OR IGNORE INTO item_locations(item_id, location_id, description_id, quantity)
         VALUES (?, ?, ?, ?)
         """,
-        (item_id, location_id, description, quantity)
+        (item_id, location_id, description_id, quantity)
     )
+    # for the scrape ledger - OR IGNORE leaves rowcount at 0 when the row was already there
+    return "inserted" if cur.rowcount else "skipped"
 
 
 # Convenience wrapper - resolve item by name -> call scrape_item_locations
@@ -103,34 +110,42 @@ def scrape_item_locations_by_name(item_name:str, db_path:str | pathlib.Path | No
     return inserted
 
 def scrape_item_locations(item_id: int, item_url: str, db_path: str | pathlib.Path | None = None) -> int:
-    inserted = 0
-
-    # See if we already have rows, skip if we do
-    with db_conn(db_path) as conn:
+    # Skip items whose page we've already read
+    with db_conn(db_path, ensure_schema_fn=ensure_schema) as conn:
         cur = conn.cursor()
-        if _has_item_location(cur, item_id):
+        if _item_page_scraped(cur, item_id):
             return 0
-        
-    #Otherwise get the HTML
-    soup: BeautifulSoup = fetch_soup(item_url)
 
-    # Fine the LOCATIONS heading 
+    # every fetch is recorded in the scrape ledger (`f76 stats`), failed ones included
+    with scrape_run(resolve_db_path(db_path), "item_locations") as run:
+        return _load_item_locations(item_id, item_url, db_path, run)
+
+def _load_item_locations(item_id: int, item_url: str, db_path: str | pathlib.Path | None, run: Run) -> int:
+    inserted = 0
+    counts = Counter()
+
+    #Otherwise get the HTML
+    try:
+        page = fetch_page(item_url)
+    except Exception as e:
+        run.add_failed(item_url, e)  # so the failed run still says which page and why
+        raise
+    run.add_fetched(page, counts)  # counts keeps filling below, the ledger reads it when the run ends
+    soup: BeautifulSoup = page.soup
+
+    # Find the LOCATIONS heading, then the first UL after it - the list of places
+    # (no heading or no list: the page was still read, it just lists nowhere)
     span = soup.select_one("span.mw-headline#Locations")
-    if not span:
-        return 0
-    h2 = span.find_parent("h2")
-    if not h2:
-        return 0
-    
-    # The first UL after the heading should be the list of places
-    ul = h2.find_next("ul")
-    if not ul:
-        return 0
-    
+    h2 = span.find_parent("h2") if span else None
+    ul = h2.find_next("ul") if h2 else None
+
     # Parse the LIs and nested LIs
-    with db_conn(db_path) as conn:
+    # ensure_schema so the yield rollup triggers exist before any rows go in
+    with db_conn(db_path, ensure_schema_fn=ensure_schema, run_id=run.id) as conn:
         cur = conn.cursor()
-        for li in ul.find_all("li", recursive=False):
+        # location id -> description ids this page lists there
+        listed: dict[int, set[int]] = {}
+        for li in (ul.find_all("li", recursive=False) if ul else []):
             a = _first_location_link(li)
             if not a:
                 continue
@@ -141,19 +156,33 @@ def scrape_item_locations(item_id: int, item_url: str, db_path: str | pathlib.Pa
         
             loc_id = _lookup_location_id_by_name(cur, loc_name)
             if loc_id is not None:
-                _insert_item_location(cur, item_id, loc_id, desc_text, qty)
+                desc_id = intern_description(cur, desc_text)
+                counts[_insert_item_location(cur, item_id, loc_id, desc_id, qty)] += 1
+                listed.setdefault(loc_id, set()).add(desc_id)
                 inserted += 1
 
                 # nested sub-points share the same location context
                 for sub in _iter_sub_points(li):
                     sub_desc = clean_text(sub.get_text(" ", strip=True))
                     sub_qty = _parse_quantity(sub_desc)
-                    _insert_item_location(cur, item_id, loc_id, sub_desc, sub_qty)
+                    sub_desc_id = intern_description(cur, sub_desc)
+                    counts[_insert_item_location(cur, item_id, loc_id, sub_desc_id, sub_qty)] += 1
+                    listed[loc_id].add(sub_desc_id)
                     inserted += 1
 
-    return inserted
-
-
-
-
+        # The item page is the better source for its own spawns: where it lists a location, other rows for the
+        # same (item, location) - the crawler's wording of the same spawn, or an older wording of this page - go.
+        # This is the other half of the crawler skipping (item, location) pairs that already have rows.
+        # DELETE (not a bulk rewrite) so the rollup & history triggers see it; the ledger counts it as an update
+        for loc_id, desc_ids in listed.items():
+            marks = ",".join("?" * len(desc_ids))
+            cur.execute(f"DELETE FROM item_locations WHERE item_id = ? AND location_id = ? AND description_id NOT IN ({marks})",
+                        (item_id, loc_id, *desc_ids))
+            counts["updated"] += cur.rowcount
+
+        cur.execute("""
+            INSERT INTO item_crawl(item_id, spawns) VALUES (?, ?)
+            ON CONFLICT(item_id) DO UPDATE SET crawled_at = datetime('now'), spawns = excluded.spawns
+        """, (item_id, inserted))
 
+    return inserted
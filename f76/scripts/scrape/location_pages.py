@@ -0,0 +1,151 @@
+import pathlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup, Tag
+
+from .throttle import AdaptiveConcurrency
+from .infra import DEFAULT_CACHE_MAX_AGE, Page, db_conn, default_cache_dir, fetch_page, make_session, resolve_db_path
+from .junk_locations import _parse_quantity
+from ..parsing_utils import clean_text
+from ..db_utils import ensure_schema, intern_description, stamp_history
+from ..ledger import scrape_run
+
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 25
+
+# Where a mention's description comes from - the nearest of these around the link
+DESCRIPTION_BLOCKS = ["li", "p", "td", "dd"]
+
+def _is_navbox(tag: Tag) -> bool:
+    # Navboxes at the bottom of the page link to *every* junk item - not what spawns here
+    return any("navbox" in c for c in tag.get("class", []))
+
+def _extract_mentions(soup: BeautifulSoup, item_ids: dict[str, int]) -> list[tuple[int, str, int | None]]:
+    """
+    Find junk items linked from a location page.
+    - `item_ids` maps lowercased item name -> item.id, only links to known junk count
+    Returns: list[(item_id, description, quantity)], one per distinct (item, description)
+    """
+    content = soup.select_one("div.mw-parser-output") or soup
+    for box in content.find_all(_is_navbox):
+        box.decompose()
+    for aside in content.find_all("aside"):  # infobox
+        aside.decompose()
+
+    seen: set[tuple[int, str]] = set()
+    out: list[tuple[int, str, int | None]] = []
+    for a in content.find_all("a", href=True):
+        if a.find("img"):
+            continue
+        name = clean_text(a.get("title") or a.get_text(" ", strip=True))
+        item_id = item_ids.get(name.lower())
+        if item_id is None:
+            continue
+        block = a.find_parent(DESCRIPTION_BLOCKS)
+        desc = clean_text(block.get_text(" ", strip=True)) if block else name
+        if (item_id, desc) in seen:
+            continue
+        seen.add((item_id, desc))
+        out.append((item_id, desc, _parse_quantity(desc)))
+    return out
+
+def _merge_mentions(cur, location_id: int, mentions: list[tuple[int, str, int | None]]) -> int:
+    """
+    Merge a location's mentions into item_locations.
+    - Items that already have rows for this location (e.g. from their own item page) are skipped,
+      so the same spawn isn't listed twice under two wordings
+    Returns the number of rows inserted.
+    """
+    existing = {item_id for (item_id,) in cur.execute(
+        "SELECT DISTINCT item_id FROM item_locations WHERE location_id = ?", (location_id,)
+    )}
+    inserted = 0
+    for item_id, desc, qty in mentions:
+        if item_id in existing:
+            continue
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO item_locations(item_id, location_id, description_id, quantity)
+            VALUES (?, ?, ?, ?)
+            """,
+            (item_id, location_id, intern_description(cur, desc), qty)
+        )
+        inserted += cur.rowcount
+    cur.execute("""
+        INSERT INTO location_crawl(location_id, mentions) VALUES (?, ?)
+        ON CONFLICT(location_id) DO UPDATE SET crawled_at = datetime('now'), mentions = excluded.mentions
+    """, (location_id, len(mentions)))
+    return inserted
+
+def crawl_locations(location_ids: list[int] | None = None, db_path: str | pathlib.Path | None = None, *,
+                    workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                    refresh: bool = False) -> tuple[int, int]:
+    """
+    Crawl location pages and merge the junk they mention into item_locations.
+    - `location_ids=None` means every location with a URL
+    - Already-crawled locations are skipped unless `refresh` is set, which also bypasses the page cache
+    - Pages are fetched by at most `workers` threads at once (fewer while the wiki is slow or erroring)
+      and cached on disk
+    - Only this (main) thread touches SQLite; it commits every `batch_size` pages
+    Returns: (pages crawled, rows inserted)
+    """
+    with db_conn(db_path, ensure_schema_fn=ensure_schema) as conn:
+        q = "SELECT l.id, l.url FROM location l WHERE l.url IS NOT NULL"
+        if not refresh:
+            q += " AND NOT EXISTS (SELECT 1 FROM location_crawl c WHERE c.location_id = l.id)"
+        todo = conn.execute(q).fetchall()
+        if location_ids is not None:
+            wanted = set(location_ids)
+            todo = [(lid, url) for lid, url in todo if lid in wanted]
+        item_ids = {name.lower(): iid for iid, name in conn.execute("SELECT id, name FROM item")}
+    if not todo:
+        return 0, 0
+
+    cache_dir = default_cache_dir(db_path)
+    # a refresh goes to the wiki - the cached copy is what we'd be refreshing (max_age 0 still re-fills the cache)
+    max_age = 0 if refresh else DEFAULT_CACHE_MAX_AGE
+    # `workers` is the ceiling - requests in flight start at half of it and adapt to how the wiki responds
+    session = make_session(concurrency=AdaptiveConcurrency(initial=max(1, workers // 2), maximum=workers))
+
+    def work(url: str) -> tuple[Page, list[tuple[int, str, int | None]]]:
+        # runs on a worker thread: network + parsing only, no DB access
+        page = fetch_page(url, session=session, cache_dir=cache_dir, max_age=max_age)
+        mentions = _extract_mentions(page.soup, item_ids)
+        page.soup = None  # the ledger only needs the numbers - let the tree be freed
+        return page, mentions
+
+    crawled, inserted = 0, 0
+    # 🫧 Refresh - ThreadPoolExecutor 🫧
+    # A fixed pool of threads pulls jobs off a queue - `max_workers` is the cap on requests in flight.
+    # Threads suit this job because it's mostly waiting on the network (the GIL is released while waiting)
+    # Docs: https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+    # The ledger run wraps the crawl connection so its final write happens after the crawl has committed
+    with scrape_run(resolve_db_path(db_path), "location_pages") as run, \
+         db_conn(db_path, run_id=run.id) as conn, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(work, url): (lid, url) for lid, url in todo}
+        cur = conn.cursor()
+        for fut in as_completed(futures):
+            lid, url = futures[fut]
+            try:
+                page, mentions = fut.result()
+            except Exception as e:
+                print(f"Skipping location {lid}: {e}")
+                run.add_failed(url, e)
+                continue
+            added = _merge_mentions(cur, lid, mentions)
+            run.add_fetched(page, Counter(inserted=added, skipped=len(mentions) - added))
+            inserted += added
+            crawled += 1
+            if crawled % batch_size == 0:
+                # the history stamp lives for one transaction - clear it for the commit, then stamp the next batch
+                stamp_history(conn, None)
+                conn.commit()
+                stamp_history(conn, run.id)
+    return crawled, inserted
+
+def main(db_path: str | pathlib.Path | None = None):
+    crawled, inserted = crawl_locations(db_path=db_path)
+    print(f"Crawled {crawled} location pages, added {inserted} item locations.")
+
+if __name__ == "__main__":
+    main()
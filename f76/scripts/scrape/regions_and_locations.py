@@ -1,14 +1,31 @@
 import pathlib
+from collections import Counter
 from bs4 import BeautifulSoup
 from ..parsing_utils import clean_text
+from ..name_cache import write_name_cache
 from ..db_utils import ensure_schema
-from .infra import db_conn, fetch_soup
+from ..games import BASE, Game, get_game
+from ..ledger import Run, scrape_run
+from .infra import db_conn, resolve_db_path, fetch_page
 
-BASE = "https://fallout.fandom.com"
-URL = "https://fallout.fandom.com/wiki/Fallout_76_locations"
+def main(db_path: str | pathlib.Path | None = None, game: Game | None = None):
+    game = game or get_game(None)
+    if game.locations_url is None:
+        print(f"No regions/locations source registered for {game.title}, skipping.")
+        return
+    # every run is recorded in the scrape ledger (`f76 stats`), failed ones included
+    with scrape_run(resolve_db_path(db_path), "regions_and_locations") as run:
+        _load_regions_and_locations(db_path, game, run)
 
-def main(db_path: str | pathlib.Path | None = None):
-    soup: BeautifulSoup = fetch_soup(URL)
+def _load_regions_and_locations(db_path: str | pathlib.Path | None, game: Game, run: Run):
+    try:
+        page = fetch_page(game.locations_url)
+    except Exception as e:
+        run.add_failed(game.locations_url, e)  # so the failed run still says which page and why
+        raise
+    soup: BeautifulSoup = page.soup
+    counts = Counter()  # region + location rows: inserted / updated / skipped
+    run.add_fetched(page, counts)  # counts keeps filling below, the ledger reads it when the run ends
     # Anchor will be REGIONS heading 
     anchor = soup.select_one("#Regions")
     if not anchor:
@@ -80,7 +97,12 @@ def main(db_path: str | pathlib.Path | None = None):
             # regions table upsert
             for name, url in regions:
                 cur.execute("INSERT OR IGNORE INTO region(name, url) VALUES (?, ?)", (name, url))
-                cur.execute("UPDATE region SET url = COALESCE(url, ?) WHERE name = ?", (url, name))
+                if cur.rowcount:
+                    counts["inserted"] += 1
+                    continue
+                # only fills a missing url - rowcount says whether anything changed
+                cur.execute("UPDATE region SET url = COALESCE(url, ?) WHERE name = ? AND url IS NULL", (url, name))
+                counts["updated" if cur.rowcount else "skipped"] += 1
 
             # locations per region
             for region_name, _ in regions:
@@ -94,6 +116,15 @@ def main(db_path: str | pathlib.Path | None = None):
 
                 locations = parse_location_for_region(region_name)
                 for location_name, location_url in locations:
+                    existing = cur.execute(
+                        "SELECT url FROM location WHERE name = ? AND region_id = ?", (location_name, region_id)
+                    ).fetchone()
+                    if existing is None:
+                        counts["inserted"] += 1
+                    elif existing[0] is None and location_url:
+                        counts["updated"] += 1
+                    else:
+                        counts["skipped"] += 1
                     cur.execute("""
                         INSERT INTO location(name, region_id, url)
                         VALUES (?, ?, ?)
@@ -102,6 +133,9 @@ def main(db_path: str | pathlib.Path | None = None):
                     """, (location_name, region_id, location_url))
                 total_locations += len(locations)
 
+        # keep shell completion in step with the names we just loaded
+        write_name_cache(conn, resolve_db_path(db_path))
+
     print(f"Loaded {len(regions)} regions and {total_locations} locations.")
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+import email.utils, random, threading, time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .. import profiling
+
+# --- Polite, resilient HTTP ---
+# Every request made through a `ThrottledSession` (what `infra.make_session` returns) goes through three layers:
+#   1. a token bucket per host - caps the request *rate*, shared by every session and thread in the process
+#   2. an optional adaptive concurrency limit - caps requests *in flight*, grows and shrinks with how the site is doing
+#   3. retries with jittered exponential backoff for transient failures, honouring the server's Retry-After
+# Requests that still fail after the retries raise exactly like a bare `requests.get` would.
+
+DEFAULT_RATE = 4.0         # requests per second, per host
+DEFAULT_BURST = 4          # requests allowed back to back before the rate kicks in
+POOL_SIZE = 16             # keep-alive connections per host - above the crawler's worker cap so threads never queue for a socket
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5         # seconds - first retry waits up to this, doubling each attempt
+BACKOFF_CAP = 30.0
+RETRY_AFTER_CAP = 120.0    # never trust a Retry-After longer than this
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_METHODS = frozenset({"GET", "HEAD"})   # only retry what's safe to repeat
+
+# 🫧 Refresh - Token bucket 🫧
+# A bucket holds up to `burst` tokens and refills at `rate` tokens per second.
+# Each request takes one token, waiting for the refill if the bucket is empty.
+# Short bursts go straight through, but the long-run average can never beat `rate`.
+# Docs: https://en.wikipedia.org/wiki/Token_bucket
+class TokenBucket:
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            # sleep outside the lock so other threads can check the bucket meanwhile
+            time.sleep(wait)
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def bucket_for(url: str) -> TokenBucket:
+    """The process-wide bucket for a URL's host"""
+    host = urlsplit(url).netloc
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket()
+        return _buckets[host]
+
+# 🫧 Refresh - AIMD (additive increase, multiplicative decrease) 🫧
+# The same idea TCP uses to find a link's speed: creep the limit up by one while things go well,
+# halve it as soon as they don't. It settles just under what the server is happy with,
+# and gets out of the way fast when the server starts struggling.
+# Docs: https://en.wikipedia.org/wiki/Additive_increase/multiplicative_decrease
+class AdaptiveConcurrency:
+    """
+    Caps how many requests are in flight, adjusting the cap as responses come back.
+    - A failure (error, 429, 5xx) or a response slower than `latency_target` halves the cap -
+      once per window: requests already in flight when it was halved can't halve it again
+    - A full window of healthy responses (one per slot) raises it by one, up to `maximum`
+    """
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8, latency_target: float = 2.0):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.healthy = 0
+        self.last_cut = float("-inf")   # monotonic time of the last decrease
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self.cond:
+            while self.in_flight >= self.limit:
+                self.cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.in_flight -= 1
+                self.cond.notify_all()
+
+    def record(self, ok: bool, latency: float):
+        with self.cond:
+            if not ok or latency > self.latency_target:
+                # Like TCP, one decrease per round trip: a slow burst comes back as several bad responses
+                # at once, but they're all news about the same moment - only one sent after the last cut counts
+                now = time.monotonic()
+                if now - latency >= self.last_cut:
+                    self.limit = max(self.minimum, self.limit // 2)
+                    self.last_cut = now
+                self.healthy = 0
+            else:
+                self.healthy += 1
+                if self.healthy >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self.healthy = 0
+            self.cond.notify_all()
+
+# --- Retries ---
+def retry_after(resp: requests.Response) -> Optional[float]:
+    """Seconds the server asked us to wait, from a Retry-After header (seconds or HTTP date), if any"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_CAP)
+
+def backoff(attempt: int) -> float:
+    # "Full jitter": a random wait between 0 and the exponential cap, so clients that
+    # failed together don't all come back together
+    # Docs: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+class ThrottledSession(requests.Session):
+    """
+    A requests.Session that rate limits, retries and (optionally) adapts its concurrency.
+    - `concurrency` is shared by everyone using this session - the location crawler passes one in
+    """
+    def __init__(self, concurrency: Optional[AdaptiveConcurrency] = None, max_retries: int = MAX_RETRIES):
+        super().__init__()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        # urllib3's own retries stay off (max_retries=0) - ours can see every failure and feed the concurrency limit
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        retryable = method.upper() in RETRY_METHODS
+        attempt = 0
+        while True:
+            slot = self.concurrency.slot() if self.concurrency is not None else nullcontext()
+            with slot:
+                # slot first, then token - a thread parked on the slot shouldn't sit on a token too
+                bucket_for(url).acquire()
+                start = time.monotonic()
+                try:
+                    resp = super().request(method, url, *args, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    self._record(False, start)
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+                    wait = backoff(attempt)
+                else:
+                    failed = resp.status_code in RETRY_STATUSES
+                    self._record(not failed, start)
+                    if not failed or not retryable or attempt >= self.max_retries:
+                        return resp
+                    wait = retry_after(resp)
+                    wait = backoff(attempt) if wait is None else wait
+                    resp.close()  # hand the connection back to the pool before sleeping
+            attempt += 1
+            with profiling.stage("retry wait"):
+                time.sleep(wait)
+
+    def _record(self, ok: bool, start: float):
+        if self.concurrency is not None:
+            self.concurrency.record(ok, time.monotonic() - start)
@@ -0,0 +1,81 @@
+import csv, pathlib, sqlite3
+from typing import Iterable, Iterator
+
+from .parsing_utils import clean_text
+
+# --- Reading the stash export ---
+# The CSV is read with `csv.reader`, which pulls one line at a time off the file handle
+# Nothing here builds a list of rows, so a million-line export uses the same memory as a 10 line one
+# Docs: https://docs.python.org/3/library/csv.html#csv.reader
+def iter_stash_rows(path: str | pathlib.Path) -> Iterator[tuple[str, int]]:
+    """
+    Stream `item,count` rows out of a stash CSV export.
+    - Names are cleaned the same way the scrapers clean wiki text
+    - Rows without a whole-number count (headers, blanks, typos) are skipped
+    """
+    # utf-8-sig - swallows the BOM spreadsheet apps like to put at the start of CSV exports
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            name = clean_text(row[0])
+            try:
+                count = int(row[1].strip())
+            except ValueError:
+                continue
+            if name and count:
+                yield name, count
+
+# --- Totalling the stash ---
+# Instead of asking the DB "what does this item scrap into?" once per CSV line,
+# the rows are streamed into a TEMP table and the totals come from a single set-based query.
+# TEMP tables live only as long as the connection and are never written to fallout.sqlite
+# Docs: https://sqlite.org/lang_createtable.html#temp
+def load_stash(conn: sqlite3.Connection, rows: Iterable[tuple[str, int]]) -> None:
+    """
+    Load streamed (name, count) rows into `temp.stash`, one row per distinct name.
+    - Duplicate names (any casing) are summed with an UPSERT as they arrive
+    - Names are then resolved to `item.id` in bulk with one UPDATE
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.stash")
+    conn.execute("""
+        CREATE TEMP TABLE stash (
+          name    TEXT PRIMARY KEY COLLATE NOCASE,
+          count   INTEGER NOT NULL,
+          item_id INTEGER
+        )
+    """)
+    # executemany accepts any iterator - the generator is consumed lazily, row by row
+    conn.executemany("""
+        INSERT INTO temp.stash(name, count) VALUES (?, ?)
+        ON CONFLICT(name) DO UPDATE SET count = count + excluded.count
+    """, rows)
+    # Bulk name resolution - one statement, each lookup served by idx_item_name_nocase
+    conn.execute("""
+        UPDATE temp.stash
+        SET item_id = (SELECT i.id FROM item i WHERE i.name = stash.name COLLATE NOCASE)
+    """)
+
+def stash_component_totals(conn: sqlite3.Connection) -> list[tuple[str, int]]:
+    """
+    Total components for everything in `temp.stash`: SUM(count × item_scraps.quantity) per component
+    """
+    return conn.execute("""
+        SELECT c.name, SUM(st.count * s.quantity) AS total
+        FROM temp.stash st
+        JOIN item_scraps s ON s.item_id = st.item_id
+        JOIN component   c ON c.id = s.component_id
+        GROUP BY c.id
+        ORDER BY total DESC, c.name
+    """).fetchall()
+
+def stash_unmatched(conn: sqlite3.Connection) -> list[tuple[str, int]]:
+    """
+    Names in `temp.stash` that didn't resolve to a junk item, with their counts
+    """
+    return conn.execute("""
+        SELECT name, count
+        FROM temp.stash
+        WHERE item_id IS NULL
+        ORDER BY name
+    """).fetchall()
@@ -0,0 +1,289 @@
+-- Baseline schema: everything the old sql/schema.sql created.
+-- Every statement is IF NOT EXISTS, so databases created before migrations existed
+-- (user_version 0, tables already there) pass through this one safely.
+
+CREATE TABLE IF NOT EXISTS item (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  url  TEXT
+);
+
+CREATE TABLE IF NOT EXISTS component (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS item_scraps (
+  item_id INTEGER NOT NULL REFERENCES item(id) ON DELETE CASCADE,
+  component_id INTEGER NOT NULL REFERENCES component(id) ON DELETE RESTRICT,
+  quantity INTEGER NOT NULL,
+  PRIMARY KEY (item_id, component_id)
+);
+
+CREATE TABLE IF NOT EXISTS region (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS location (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  region_id INTEGER NOT NULL REFERENCES region(id) ON DELETE RESTRICT,
+  url TEXT,
+  UNIQUE(name, region_id)
+);
+
+-- A many-to-many table - an item can appear in many locations
+-- and a location can contain many items - which is why we included 2 Foreign Keys
+CREATE TABLE IF NOT EXISTS item_locations (
+  item_id INTEGER NOT NULL REFERENCES item(id) ON DELETE CASCADE,
+  location_id INTEGER NOT NULL REFERENCES location(id) ON DELETE RESTRICT,
+  description TEXT,
+  quantity INTEGER,
+  PRIMARY KEY (item_id, location_id, description)
+);
+
+-- Which location pages the location crawler has read, and how many junk mentions it found
+-- Lets `f76 loot` tell "never crawled" apart from "crawled, nothing there"
+CREATE TABLE IF NOT EXISTS location_crawl (
+  location_id INTEGER PRIMARY KEY REFERENCES location(id) ON DELETE CASCADE,
+  crawled_at TEXT NOT NULL DEFAULT (datetime('now')),
+  mentions INTEGER NOT NULL
+);
+
+-- Component yield rollups - "which location/region is best for Lead?"
+-- yield = SUM(item_locations.quantity × item_scraps.quantity), with an unknown spawn quantity counted as 1
+-- These are derived data: the triggers below keep them in step with item_locations & item_scraps,
+-- so `f76 farm` reads a handful of pre-summed rows instead of doing a four-way join every time
+CREATE TABLE IF NOT EXISTS location_component_yield (
+  component_id INTEGER NOT NULL REFERENCES component(id) ON DELETE CASCADE,
+  location_id INTEGER NOT NULL REFERENCES location(id) ON DELETE CASCADE,
+  yield INTEGER NOT NULL,
+  PRIMARY KEY (component_id, location_id)
+);
+
+CREATE TABLE IF NOT EXISTS region_component_yield (
+  component_id INTEGER NOT NULL REFERENCES component(id) ON DELETE CASCADE,
+  region_id INTEGER NOT NULL REFERENCES region(id) ON DELETE CASCADE,
+  yield INTEGER NOT NULL,
+  PRIMARY KEY (component_id, region_id)
+);
+
+-- Crafting & mod recipes - the *demand* side of the scrap economy
+-- `kind` is where the recipe came from ('craft' for workbench items, 'mod' for weapon/armor mods)
+CREATE TABLE IF NOT EXISTS recipe (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  kind TEXT NOT NULL,
+  url TEXT
+);
+
+-- What a recipe asks for, exactly as listed on the wiki
+-- `ingredient` is a name rather than a FK: it can be a component (Steel) or another recipe (Purified water)
+CREATE TABLE IF NOT EXISTS recipe_ingredient (
+  recipe_id INTEGER NOT NULL REFERENCES recipe(id) ON DELETE CASCADE,
+  ingredient TEXT NOT NULL,
+  quantity INTEGER NOT NULL,
+  PRIMARY KEY (recipe_id, ingredient)
+);
+
+-- Precomputed closure: every recipe fully expanded down to raw materials
+-- Rebuilt by the crafting scraper, so `f76 craft` is a single indexed lookup instead of a recursive walk
+CREATE TABLE IF NOT EXISTS recipe_material (
+  recipe_id INTEGER NOT NULL REFERENCES recipe(id) ON DELETE CASCADE,
+  material TEXT NOT NULL COLLATE NOCASE,
+  quantity INTEGER NOT NULL,
+  PRIMARY KEY (recipe_id, material)
+);
+
+-- Helpful indexes for common lookups
+-- These are performance helpers - they don't change the data, but speed up certain queries
+-- Without an index SQL will scan the whole table, row by row - e.g. "full table scan"
+-- In a table with 10K rows, a query like `SELECT * FROM item_locations WHERE item_id = 42`
+-- will have to check all 10,000 rows one by one, asking: "Does this row's item_id equal 42?"
+-- An index is like the index at the back of a book: instead of flipping through every page,
+-- the database jumps straight to the rows matching the search value. This makes lookups
+-- by item_id or location_id much faster, especially as the table grows. 
+
+-- SQLite builds a separate lookup structure (B-tree) for item_id(or other given id)
+-- then it sorts the values of item_id, storing pointers to the rows in the main table
+-- Now when we query for item_id = 42 SQL can perform a binary search instead of a full table scan (linear search)
+-- Binary search is logarithmic time - 0(log n) 
+-- much faster than a linear time (full table scan) - 0(n)
+
+-- Speed up queries like "What locations does this item spawn in?"
+CREATE INDEX IF NOT EXISTS idx_item_locations_item     ON item_locations(item_id);
+-- Speed up queries like "What items spawn in this location?"
+CREATE INDEX IF NOT EXISTS idx_item_locations_location ON item_locations(location_id);
+-- Speeds up queries for details about items by name
+CREATE INDEX IF NOT EXISTS idx_item_name ON item(name);
+-- The CLI looks items up with `name = ? COLLATE NOCASE` - an index only helps
+-- if it was built with the same collation, so this one is NOCASE too
+CREATE INDEX IF NOT EXISTS idx_item_name_nocase ON item(name COLLATE NOCASE);
+-- Speeds up queries for details about items by component name
+CREATE INDEX IF NOT EXISTS idx_component_name ON component(name);
+-- Same idea as idx_item_name_nocase - recipes and components are looked up case-insensitively
+CREATE INDEX IF NOT EXISTS idx_recipe_name_nocase ON recipe(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_component_name_nocase ON component(name COLLATE NOCASE);
+
+-- Rollup maintenance
+-- 🫧 Refresh - Triggers 🫧
+-- A trigger is SQL the database runs for us whenever a row is inserted/updated/deleted.
+-- `NEW` is the row after the change, `OLD` is the row before it.
+-- Each trigger only adds or subtracts the *difference* the change makes,
+-- so the rollups never need to be recomputed from scratch.
+-- Docs: https://sqlite.org/lang_createtrigger.html
+-- Note: `WHERE` is required on an INSERT ... SELECT ... ON CONFLICT, otherwise SQLite
+-- can't tell the upsert's ON from a join's ON (https://sqlite.org/lang_upsert.html#parsing_ambiguity)
+
+-- A new spawn row: add its item's scrap to that location & region
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_insert
+AFTER INSERT ON item_locations
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT s.component_id, NEW.location_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT s.component_id, l.region_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  JOIN location l ON l.id = NEW.location_id
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+-- A spawn row removed: take its scrap back out
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_delete
+AFTER DELETE ON item_locations
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = location_component_yield.component_id)
+  WHERE location_id = OLD.location_id
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = region_component_yield.component_id)
+  WHERE region_id = (SELECT region_id FROM location WHERE id = OLD.location_id)
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+END;
+
+-- A spawn row changed in place (new quantity, or moved): take the old row's scrap out, add the new row's
+-- The WHEN guard skips updates that change nothing the rollups depend on
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_update
+AFTER UPDATE OF item_id, location_id, quantity ON item_locations
+WHEN OLD.item_id <> NEW.item_id OR OLD.location_id <> NEW.location_id OR OLD.quantity IS NOT NEW.quantity
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = location_component_yield.component_id)
+  WHERE location_id = OLD.location_id
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = region_component_yield.component_id)
+  WHERE region_id = (SELECT region_id FROM location WHERE id = OLD.location_id)
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT s.component_id, NEW.location_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT s.component_id, l.region_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  JOIN location l ON l.id = NEW.location_id
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+-- An item's scrap recipe changed (junk re-scrape): apply the difference at every place it spawns
+-- The WHEN guard skips the no-op updates an unchanged re-scrape produces
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_update
+AFTER UPDATE OF quantity ON item_scraps
+WHEN OLD.quantity <> NEW.quantity
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT NEW.component_id, il.location_id, SUM(COALESCE(il.quantity, 1)) * (NEW.quantity - OLD.quantity)
+  FROM item_locations il
+  WHERE il.item_id = NEW.item_id
+  GROUP BY il.location_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT NEW.component_id, l.region_id, SUM(COALESCE(il.quantity, 1)) * (NEW.quantity - OLD.quantity)
+  FROM item_locations il
+  JOIN location l ON l.id = il.location_id
+  WHERE il.item_id = NEW.item_id
+  GROUP BY l.region_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+-- An item gained a component
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_insert
+AFTER INSERT ON item_scraps
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT NEW.component_id, il.location_id, SUM(COALESCE(il.quantity, 1)) * NEW.quantity
+  FROM item_locations il
+  WHERE il.item_id = NEW.item_id
+  GROUP BY il.location_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT NEW.component_id, l.region_id, SUM(COALESCE(il.quantity, 1)) * NEW.quantity
+  FROM item_locations il
+  JOIN location l ON l.id = il.location_id
+  WHERE il.item_id = NEW.item_id
+  GROUP BY l.region_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+-- An item lost a component
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_delete
+AFTER DELETE ON item_scraps
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - OLD.quantity * (
+    SELECT SUM(COALESCE(il.quantity, 1)) FROM item_locations il
+    WHERE il.item_id = OLD.item_id AND il.location_id = location_component_yield.location_id)
+  WHERE component_id = OLD.component_id
+    AND location_id IN (SELECT location_id FROM item_locations WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - OLD.quantity * (
+    SELECT SUM(COALESCE(il.quantity, 1)) FROM item_locations il
+    JOIN location l ON l.id = il.location_id
+    WHERE il.item_id = OLD.item_id AND l.region_id = region_component_yield.region_id)
+  WHERE component_id = OLD.component_id
+    AND region_id IN (SELECT l.region_id FROM item_locations il JOIN location l ON l.id = il.location_id
+                      WHERE il.item_id = OLD.item_id);
+END;
+
+-- One-time backfill for databases that had item_locations before the rollups existed
+-- The NOT EXISTS is a constant check, so once the rollup has rows this is a no-op
+INSERT INTO location_component_yield(component_id, location_id, yield)
+SELECT s.component_id, il.location_id, SUM(COALESCE(il.quantity, 1) * s.quantity)
+FROM item_locations il
+JOIN item_scraps s ON s.item_id = il.item_id
+WHERE NOT EXISTS (SELECT 1 FROM location_component_yield)
+GROUP BY s.component_id, il.location_id;
+
+INSERT INTO region_component_yield(component_id, region_id, yield)
+SELECT s.component_id, l.region_id, SUM(COALESCE(il.quantity, 1) * s.quantity)
+FROM item_locations il
+JOIN item_scraps s ON s.item_id = il.item_id
+JOIN location l ON l.id = il.location_id
+WHERE NOT EXISTS (SELECT 1 FROM region_component_yield)
+GROUP BY s.component_id, l.region_id;
@@ -0,0 +1,35 @@
+-- Scrape ledger: one row per scraper run, one row per page it read
+-- Lets `f76 stats` answer "when was this last scraped, how long did it take, what changed?"
+-- and spot pages that suddenly got much bigger or a parser that started dropping rows.
+
+CREATE TABLE IF NOT EXISTS scrape_run (
+  id INTEGER PRIMARY KEY,
+  scraper TEXT NOT NULL,       -- 'junk_items', 'regions_and_locations', 'item_locations', 'location_pages'
+  started_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+  finished_at TEXT,
+  status TEXT NOT NULL DEFAULT 'running',   -- running | ok | failed
+  error TEXT
+);
+
+-- rows_* count the data rows the page produced:
+--   inserted - new rows, updated - existing rows whose values changed,
+--   skipped  - rows parsed from the page that were already up to date
+-- so inserted + updated + skipped is "rows the parser found on this page"
+CREATE TABLE IF NOT EXISTS scrape_page (
+  id INTEGER PRIMARY KEY,
+  run_id INTEGER NOT NULL REFERENCES scrape_run(id) ON DELETE CASCADE,
+  url TEXT NOT NULL,
+  http_status INTEGER,         -- NULL when served from the page cache
+  bytes INTEGER,
+  fetch_ms REAL,
+  parse_ms REAL,
+  rows_inserted INTEGER NOT NULL DEFAULT 0,
+  rows_updated INTEGER NOT NULL DEFAULT 0,
+  rows_skipped INTEGER NOT NULL DEFAULT 0,
+  error TEXT
+);
+
+-- "history of this URL" for regression checks, newest run last
+CREATE INDEX IF NOT EXISTS idx_scrape_page_url ON scrape_page(url, run_id);
+CREATE INDEX IF NOT EXISTS idx_scrape_page_run ON scrape_page(run_id);
+CREATE INDEX IF NOT EXISTS idx_scrape_run_scraper ON scrape_run(scraper, id);
@@ -0,0 +1,110 @@
+-- Change history for item_scraps & item_locations - "what did a Desk fan scrap into last month?"
+-- Rows are deltas, not snapshots: triggers write one row per key that actually changed, tagged with
+-- the scrape generation (scrape_run.id) that changed it. A re-scrape that changes nothing writes nothing,
+-- so history grows with the size of the changes, not with the number of refreshes.
+--
+-- The generation is the newest scrape_run row - the ledger inserts the 'running' row before a scraper
+-- writes anything, so that's the run doing the writing. Writes made with no run at all land in generation 0.
+-- A key changed twice in one run keeps one row: its value at the end of that run.
+--
+-- To read a key's value as of a date: take its row with the highest run_id among runs started by then.
+-- quantity / present say what it was; a NULL quantity in scrap_history means the link was removed.
+
+CREATE TABLE IF NOT EXISTS scrap_history (
+  item_id INTEGER NOT NULL,
+  component_id INTEGER NOT NULL,
+  run_id INTEGER NOT NULL,
+  quantity INTEGER,            -- NULL = removed in this run
+  PRIMARY KEY (item_id, component_id, run_id)
+) WITHOUT ROWID;
+
+-- description is part of item_locations' key but may be NULL there - stored as '' here,
+-- because WITHOUT ROWID keys can't hold NULLs
+CREATE TABLE IF NOT EXISTS location_history (
+  item_id INTEGER NOT NULL,
+  location_id INTEGER NOT NULL,
+  description TEXT NOT NULL,
+  run_id INTEGER NOT NULL,
+  quantity INTEGER,
+  present INTEGER NOT NULL,    -- 1 = added/changed, 0 = removed in this run
+  PRIMARY KEY (item_id, location_id, description, run_id)
+) WITHOUT ROWID;
+
+-- `f76 changes --since` walks generations forward from a date
+CREATE INDEX IF NOT EXISTS idx_scrap_history_run ON scrap_history(run_id);
+CREATE INDEX IF NOT EXISTS idx_location_history_run ON location_history(run_id);
+CREATE INDEX IF NOT EXISTS idx_scrape_run_started ON scrape_run(started_at);
+
+-- item_scraps -> scrap_history
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_insert
+AFTER INSERT ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_update
+AFTER UPDATE OF quantity ON item_scraps
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_delete
+AFTER DELETE ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (OLD.item_id, OLD.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NULL)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = NULL;
+END;
+
+-- item_locations -> location_history
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_insert
+AFTER INSERT ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, COALESCE(NEW.description, ''),
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_update
+AFTER UPDATE OF quantity ON item_locations
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, COALESCE(NEW.description, ''),
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_delete
+AFTER DELETE ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description, run_id, quantity, present)
+  VALUES (OLD.item_id, OLD.location_id, COALESCE(OLD.description, ''),
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), OLD.quantity, 0)
+  ON CONFLICT(item_id, location_id, description, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 0;
+END;
+
+-- Baseline: databases that already hold data get one 'baseline' generation holding today's values,
+-- so history starts from what was known when it was switched on
+INSERT INTO scrape_run(scraper, finished_at, status)
+SELECT 'baseline', strftime('%Y-%m-%dT%H:%M:%SZ', 'now'), 'ok'
+WHERE EXISTS (SELECT 1 FROM item_scraps) OR EXISTS (SELECT 1 FROM item_locations);
+
+INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+SELECT item_id, component_id, (SELECT MAX(id) FROM scrape_run), quantity
+FROM item_scraps;
+
+INSERT INTO location_history(item_id, location_id, description, run_id, quantity, present)
+SELECT item_id, location_id, COALESCE(description, ''), (SELECT MAX(id) FROM scrape_run), quantity, 1
+FROM item_locations
+WHERE true
+ON CONFLICT DO NOTHING;  -- '' and NULL descriptions for the same spawn collapse into one row
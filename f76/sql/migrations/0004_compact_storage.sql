@@ -0,0 +1,294 @@
+-- Compact storage for the two big junction tables
+--
+-- 1. Spawn descriptions are interned: each distinct text is stored once in `description`,
+--    and item_locations / location_history keep a small integer `description_id` in their keys instead.
+--    The same "Two on the desk" no longer sits in the table, its primary key index and every history row.
+--    id 0 is the empty description - it stands in for "the wiki didn't say", so keys never hold NULLs.
+--
+-- 2. 🫧 Refresh - WITHOUT ROWID 🫧
+--    A normal table is a B-tree keyed by a hidden rowid, and its PRIMARY KEY is a *second* B-tree
+--    pointing back at it - every key is stored twice and every lookup by key walks two trees.
+--    A WITHOUT ROWID table is one B-tree ordered by the primary key itself, which suits tables
+--    whose key *is* the data, like item_scraps (item, component) and item_locations (item, location, description).
+--    Docs: https://sqlite.org/withoutrowid.html
+--
+-- 3. Covering indexes for the reverse lookups. A secondary index on a WITHOUT ROWID table carries
+--    the table's primary key columns too, so e.g. item_scraps(component_id, quantity) already holds
+--    item_id - `f76 sources` is answered from the index alone, never touching the table.
+--    Docs: https://sqlite.org/queryplanner.html#covidx
+--
+-- SQLite can't change a table's key in place, so the tables are rebuilt: create the new shape,
+-- copy the rows over, drop the old table, rename. The triggers on them go with the old tables
+-- and are recreated at the end (same logic as 0001/0003, reading description_id).
+-- Docs: https://sqlite.org/lang_altertable.html#otheralter
+
+CREATE TABLE IF NOT EXISTS description (
+  id INTEGER PRIMARY KEY,
+  text TEXT NOT NULL UNIQUE
+);
+INSERT OR IGNORE INTO description(id, text) VALUES (0, '');
+
+INSERT OR IGNORE INTO description(text)
+SELECT description FROM item_locations WHERE description IS NOT NULL
+UNION
+SELECT description FROM location_history;
+
+-- Every trigger below reads or writes the tables being rebuilt
+DROP TRIGGER IF EXISTS trg_item_locations_yield_insert;
+DROP TRIGGER IF EXISTS trg_item_locations_yield_delete;
+DROP TRIGGER IF EXISTS trg_item_locations_yield_update;
+DROP TRIGGER IF EXISTS trg_item_scraps_yield_update;
+DROP TRIGGER IF EXISTS trg_item_scraps_yield_insert;
+DROP TRIGGER IF EXISTS trg_item_scraps_yield_delete;
+DROP TRIGGER IF EXISTS trg_item_scraps_history_insert;
+DROP TRIGGER IF EXISTS trg_item_scraps_history_update;
+DROP TRIGGER IF EXISTS trg_item_scraps_history_delete;
+DROP TRIGGER IF EXISTS trg_item_locations_history_insert;
+DROP TRIGGER IF EXISTS trg_item_locations_history_update;
+DROP TRIGGER IF EXISTS trg_item_locations_history_delete;
+
+-- item_scraps
+CREATE TABLE item_scraps_new (
+  item_id INTEGER NOT NULL REFERENCES item(id) ON DELETE CASCADE,
+  component_id INTEGER NOT NULL REFERENCES component(id) ON DELETE RESTRICT,
+  quantity INTEGER NOT NULL,
+  PRIMARY KEY (item_id, component_id)
+) WITHOUT ROWID;
+
+INSERT INTO item_scraps_new(item_id, component_id, quantity)
+SELECT item_id, component_id, quantity FROM item_scraps;
+
+DROP TABLE item_scraps;
+ALTER TABLE item_scraps_new RENAME TO item_scraps;
+
+-- item_locations
+CREATE TABLE item_locations_new (
+  item_id INTEGER NOT NULL REFERENCES item(id) ON DELETE CASCADE,
+  location_id INTEGER NOT NULL REFERENCES location(id) ON DELETE RESTRICT,
+  description_id INTEGER NOT NULL DEFAULT 0 REFERENCES description(id),
+  quantity INTEGER,
+  PRIMARY KEY (item_id, location_id, description_id)
+) WITHOUT ROWID;
+
+-- a NULL and a '' description for the same spawn collapse into one row, as they already did in location_history
+INSERT OR IGNORE INTO item_locations_new(item_id, location_id, description_id, quantity)
+SELECT il.item_id, il.location_id, d.id, il.quantity
+FROM item_locations il
+JOIN description d ON d.text = COALESCE(il.description, '');
+
+DROP TABLE item_locations;
+ALTER TABLE item_locations_new RENAME TO item_locations;
+
+-- location_history
+CREATE TABLE location_history_new (
+  item_id INTEGER NOT NULL,
+  location_id INTEGER NOT NULL,
+  description_id INTEGER NOT NULL,
+  run_id INTEGER NOT NULL,
+  quantity INTEGER,
+  present INTEGER NOT NULL,    -- 1 = added/changed, 0 = removed in this run
+  PRIMARY KEY (item_id, location_id, description_id, run_id)
+) WITHOUT ROWID;
+
+INSERT INTO location_history_new(item_id, location_id, description_id, run_id, quantity, present)
+SELECT h.item_id, h.location_id, d.id, h.run_id, h.quantity, h.present
+FROM location_history h
+JOIN description d ON d.text = h.description;
+
+DROP TABLE location_history;
+ALTER TABLE location_history_new RENAME TO location_history;
+
+-- Indexes
+-- item_scraps' and item_locations' primary keys start with item_id, so `f76 scrap` / `f76 where`
+-- are plain key seeks - the old separate item_id index is gone with the old table.
+-- "Which items scrap into Lead?" (`f76 sources`, `f76 craft`, the yield triggers) - covering, holds item_id
+CREATE INDEX IF NOT EXISTS idx_item_scraps_component ON item_scraps(component_id, quantity);
+-- "What spawns at this location?" (`f76 loot`, the crawler) - covering, holds item_id & description_id
+CREATE INDEX IF NOT EXISTS idx_item_locations_location ON item_locations(location_id, quantity);
+CREATE INDEX IF NOT EXISTS idx_location_history_run ON location_history(run_id);
+-- `f76 whereis` / `f76 loot` look locations up by name, case-insensitively (see idx_item_name_nocase)
+CREATE INDEX IF NOT EXISTS idx_location_name_nocase ON location(name COLLATE NOCASE);
+
+-- Rollup maintenance (as in 0001)
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_insert
+AFTER INSERT ON item_locations
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT s.component_id, NEW.location_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT s.component_id, l.region_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  JOIN location l ON l.id = NEW.location_id
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_delete
+AFTER DELETE ON item_locations
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = location_component_yield.component_id)
+  WHERE location_id = OLD.location_id
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = region_component_yield.component_id)
+  WHERE region_id = (SELECT region_id FROM location WHERE id = OLD.location_id)
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_yield_update
+AFTER UPDATE OF item_id, location_id, quantity ON item_locations
+WHEN OLD.item_id <> NEW.item_id OR OLD.location_id <> NEW.location_id OR OLD.quantity IS NOT NEW.quantity
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = location_component_yield.component_id)
+  WHERE location_id = OLD.location_id
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - COALESCE(OLD.quantity, 1) * (
+    SELECT s.quantity FROM item_scraps s
+    WHERE s.item_id = OLD.item_id AND s.component_id = region_component_yield.component_id)
+  WHERE region_id = (SELECT region_id FROM location WHERE id = OLD.location_id)
+    AND component_id IN (SELECT component_id FROM item_scraps WHERE item_id = OLD.item_id);
+
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT s.component_id, NEW.location_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT s.component_id, l.region_id, COALESCE(NEW.quantity, 1) * s.quantity
+  FROM item_scraps s
+  JOIN location l ON l.id = NEW.location_id
+  WHERE s.item_id = NEW.item_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_update
+AFTER UPDATE OF quantity ON item_scraps
+WHEN OLD.quantity <> NEW.quantity
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT NEW.component_id, il.location_id, SUM(COALESCE(il.quantity, 1)) * (NEW.quantity - OLD.quantity)
+  FROM item_locations il
+  WHERE il.item_id = NEW.item_id
+  GROUP BY il.location_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT NEW.component_id, l.region_id, SUM(COALESCE(il.quantity, 1)) * (NEW.quantity - OLD.quantity)
+  FROM item_locations il
+  JOIN location l ON l.id = il.location_id
+  WHERE il.item_id = NEW.item_id
+  GROUP BY l.region_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_insert
+AFTER INSERT ON item_scraps
+BEGIN
+  INSERT INTO location_component_yield(component_id, location_id, yield)
+  SELECT NEW.component_id, il.location_id, SUM(COALESCE(il.quantity, 1)) * NEW.quantity
+  FROM item_locations il
+  WHERE il.item_id = NEW.item_id
+  GROUP BY il.location_id
+  ON CONFLICT(component_id, location_id) DO UPDATE SET yield = yield + excluded.yield;
+
+  INSERT INTO region_component_yield(component_id, region_id, yield)
+  SELECT NEW.component_id, l.region_id, SUM(COALESCE(il.quantity, 1)) * NEW.quantity
+  FROM item_locations il
+  JOIN location l ON l.id = il.location_id
+  WHERE il.item_id = NEW.item_id
+  GROUP BY l.region_id
+  ON CONFLICT(component_id, region_id) DO UPDATE SET yield = yield + excluded.yield;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_yield_delete
+AFTER DELETE ON item_scraps
+BEGIN
+  UPDATE location_component_yield
+  SET yield = yield - OLD.quantity * (
+    SELECT SUM(COALESCE(il.quantity, 1)) FROM item_locations il
+    WHERE il.item_id = OLD.item_id AND il.location_id = location_component_yield.location_id)
+  WHERE component_id = OLD.component_id
+    AND location_id IN (SELECT location_id FROM item_locations WHERE item_id = OLD.item_id);
+
+  UPDATE region_component_yield
+  SET yield = yield - OLD.quantity * (
+    SELECT SUM(COALESCE(il.quantity, 1)) FROM item_locations il
+    JOIN location l ON l.id = il.location_id
+    WHERE il.item_id = OLD.item_id AND l.region_id = region_component_yield.region_id)
+  WHERE component_id = OLD.component_id
+    AND region_id IN (SELECT l.region_id FROM item_locations il JOIN location l ON l.id = il.location_id
+                      WHERE il.item_id = OLD.item_id);
+END;
+
+-- History (as in 0003)
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_insert
+AFTER INSERT ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_update
+AFTER UPDATE OF quantity ON item_scraps
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_delete
+AFTER DELETE ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (OLD.item_id, OLD.component_id, (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NULL)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_insert
+AFTER INSERT ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, NEW.description_id,
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_update
+AFTER UPDATE OF quantity ON item_locations
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, NEW.description_id,
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_delete
+AFTER DELETE ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (OLD.item_id, OLD.location_id, OLD.description_id,
+          (SELECT COALESCE(MAX(id), 0) FROM scrape_run), OLD.quantity, 0)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 0;
+END;
@@ -0,0 +1,26 @@
+-- Which item pages the item-location scraper has read - the item-side twin of location_crawl
+-- `f76 where` scrapes an item's own page the first time the item is asked for, and checks this table
+-- to know it has. It can't go by "the item has item_locations rows": rows the location crawler added
+-- only cover the locations that were crawled, and would hide the rest of the item's spawns for good.
+CREATE TABLE IF NOT EXISTS item_crawl (
+  item_id INTEGER PRIMARY KEY REFERENCES item(id) ON DELETE CASCADE,
+  crawled_at TEXT NOT NULL DEFAULT (datetime('now')),
+  spawns INTEGER NOT NULL      -- spawn rows the page listed
+);
+
+-- Backfill, part 1 - from the scrape ledger: item pages a successful item_locations run read without error
+INSERT OR IGNORE INTO item_crawl(item_id, crawled_at, spawns)
+SELECT i.id, MAX(r.started_at), (SELECT COUNT(*) FROM item_locations il WHERE il.item_id = i.id)
+FROM scrape_page p
+JOIN scrape_run r ON r.id = p.run_id
+JOIN item i ON i.url = p.url
+WHERE r.scraper = 'item_locations' AND r.status = 'ok' AND p.error IS NULL
+GROUP BY i.id;
+
+-- Backfill, part 2 - everything else already in item_locations. Rows stored before the ledger existed
+-- (the shipped database included) came from the item's own page, the only thing that wrote spawns back then.
+-- Without this, every one of those items would be fetched again - and `f76 where` would need the network.
+INSERT OR IGNORE INTO item_crawl(item_id, spawns)
+SELECT item_id, COUNT(*)
+FROM item_locations
+GROUP BY item_id;
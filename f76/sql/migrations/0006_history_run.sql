@@ -0,0 +1,75 @@
+-- Stamp history rows with the run that actually made the change.
+-- Until now the triggers charged every change to the newest scrape_run row. That's wrong for writes made
+-- outside a run (pruning, `f76 import`) and for a run that starts while another one is still writing:
+-- their changes were filed under whichever run happened to be newest.
+--
+-- Now a writer names its run in `history_run` inside its own write transaction, and clears it before committing
+-- (db_utils.stamp_history). SQLite lets one connection write at a time, so while the row is there
+-- every change being made belongs to that run. No row - a write outside any run - lands in generation 0, as 0003 says.
+CREATE TABLE IF NOT EXISTS history_run (
+  id INTEGER PRIMARY KEY CHECK (id = 1),   -- at most one row
+  run_id INTEGER NOT NULL
+);
+
+DROP TRIGGER IF EXISTS trg_item_scraps_history_insert;
+DROP TRIGGER IF EXISTS trg_item_scraps_history_update;
+DROP TRIGGER IF EXISTS trg_item_scraps_history_delete;
+DROP TRIGGER IF EXISTS trg_item_locations_history_insert;
+DROP TRIGGER IF EXISTS trg_item_locations_history_update;
+DROP TRIGGER IF EXISTS trg_item_locations_history_delete;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_insert
+AFTER INSERT ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, COALESCE((SELECT run_id FROM history_run), 0), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_update
+AFTER UPDATE OF quantity ON item_scraps
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (NEW.item_id, NEW.component_id, COALESCE((SELECT run_id FROM history_run), 0), NEW.quantity)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = excluded.quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_scraps_history_delete
+AFTER DELETE ON item_scraps
+BEGIN
+  INSERT INTO scrap_history(item_id, component_id, run_id, quantity)
+  VALUES (OLD.item_id, OLD.component_id, COALESCE((SELECT run_id FROM history_run), 0), NULL)
+  ON CONFLICT(item_id, component_id, run_id) DO UPDATE SET quantity = NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_insert
+AFTER INSERT ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, NEW.description_id,
+          COALESCE((SELECT run_id FROM history_run), 0), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_update
+AFTER UPDATE OF quantity ON item_locations
+WHEN OLD.quantity IS NOT NEW.quantity
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (NEW.item_id, NEW.location_id, NEW.description_id,
+          COALESCE((SELECT run_id FROM history_run), 0), NEW.quantity, 1)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_item_locations_history_delete
+AFTER DELETE ON item_locations
+BEGIN
+  INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present)
+  VALUES (OLD.item_id, OLD.location_id, OLD.description_id,
+          COALESCE((SELECT run_id FROM history_run), 0), OLD.quantity, 0)
+  ON CONFLICT(item_id, location_id, description_id, run_id)
+  DO UPDATE SET quantity = excluded.quantity, present = 0;
+END;
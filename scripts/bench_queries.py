@@ -0,0 +1,120 @@
+"""
+Time every CLI lookup and every sql/ insight query against synthetic databases of growing size,
+and show how each one's latency grows with the data.
+
+    python scripts/bench_queries.py                        # scales 0.01, 0.03, 0.1 of full size
+    python scripts/bench_queries.py --scales 0.01,0.1,1    # up to 100k items / 1M scraps / ~5M spawns
+
+Databases are generated once per scale into --workdir (by scripts/synth_dataset.py) and reused.
+Lookups use the exact SQL the CLI runs (the *_SQL constants in f76/api.py and f76/cli.py), on one open connection,
+with a different real name from the database on each repetition.
+
+"growth" is the log-log slope between the smallest and largest scale:
+~0 means the query doesn't care how big the data is (an index seek), ~1 means it grows with it (a scan).
+"""
+import argparse, math, pathlib, random, sqlite3, statistics, sys, tempfile, time
+from contextlib import closing
+
+from f76 import api, cli
+from synth_dataset import generate, scaled
+
+REPO = pathlib.Path(__file__).resolve().parents[1]
+
+def _sample(conn: sqlite3.Connection, sql: str, n: int, rng: random.Random) -> list:
+    values = [v for (v,) in conn.execute(sql)]
+    return [rng.choice(values) for _ in range(n)] if values else [None] * n
+
+def lookups(conn: sqlite3.Connection, n: int, rng: random.Random) -> dict[str, tuple[str, list[tuple]]]:
+    """name -> (sql, params for each repetition)"""
+    items = _sample(conn, "SELECT name FROM item", n, rng)
+    comps = _sample(conn, "SELECT name FROM component", n, rng)
+    locs = _sample(conn, "SELECT name FROM location", n, rng)
+    regions = _sample(conn, "SELECT name FROM region", n, rng)
+    recipes = _sample(conn, "SELECT name FROM recipe", n, rng)
+    later = "9999-12-31T00:00:00Z"
+    return {
+        "scrap":            (api.SCRAP_SQL, [(i,) for i in items]),
+        "scrap --as-of":    (api.SCRAP_AS_OF_SQL, [(i, later) for i in items]),
+        "sources":          (api.SOURCES_SQL, [(c,) for c in comps]),
+        "whereis":          (api.WHEREIS_SQL, [(l,) for l in locs]),
+        "places":           (api.PLACES_SQL, [(r,) for r in regions]),
+        "regions":          (api.REGIONS_SQL, [()] * n),
+        "where":            (api.WHERE_SQL, [(i,) for i in items]),
+        "loot":             (cli.LOOT_SQL, [(l,) for l in locs]),
+        "farm (regions)":   (cli.FARM_REGIONS_SQL, [(c,) for c in comps]),
+        "farm (locations)": (cli.FARM_LOCATIONS_SQL, [(c, 15) for c in comps]),
+        "craft":            (cli.CRAFT_SQL, [(r, 3) for r in recipes]),
+        # nothing has run since `later`, so these time finding the starting generation, not printing history
+        "changes (scraps)": (cli.CHANGES_SCRAP_SQL, [(later,)] * n),
+        "changes (spawns)": (cli.CHANGES_SPAWN_SQL, [(later,)] * n),
+    }
+
+def insight_queries() -> dict[str, list[str]]:
+    """Every .sql file under sql/ -> its statements (comment-only chunks dropped)"""
+    out = {}
+    for path in sorted((REPO / "sql").rglob("*.sql")):
+        statements, buf = [], ""
+        for line in path.read_text(encoding="utf-8").splitlines(keepends=True):
+            buf += line
+            if sqlite3.complete_statement(buf):
+                statements.append(buf)
+                buf = ""
+        out[str(path.relative_to(REPO))] = statements
+    return out
+
+def _time(conn: sqlite3.Connection, sql: str, params: tuple) -> float:
+    start = time.perf_counter()
+    conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+def bench(db_path: pathlib.Path, repeat: int, seed: int) -> dict[str, list[float]]:
+    """name -> per-repetition milliseconds"""
+    rng = random.Random(seed)
+    results: dict[str, list[float]] = {}
+    with closing(sqlite3.connect(db_path)) as conn:
+        for name, (sql, params) in lookups(conn, repeat, rng).items():
+            _time(conn, sql, params[0])  # warm the page cache and the statement cache
+            results[name] = [_time(conn, sql, p) for p in params]
+        for name, statements in insight_queries().items():
+            for s in statements:
+                _time(conn, s, ())
+            results[name] = [sum(_time(conn, s, ()) for s in statements) for _ in range(repeat)]
+    return results
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Benchmark f76 queries at growing synthetic data sizes")
+    ap.add_argument("--scales", default="0.01,0.03,0.1", help="comma separated fractions of full size")
+    ap.add_argument("--repeat", type=int, default=20, help="timed runs per query per scale")
+    ap.add_argument("--workdir", type=pathlib.Path, default=pathlib.Path(tempfile.gettempdir()) / "f76-bench")
+    ap.add_argument("--seed", type=int, default=76)
+    args = ap.parse_args(argv)
+
+    scales = sorted(float(s) for s in args.scales.split(","))
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    medians: dict[str, list[float]] = {}
+    sizes: list[int] = []
+    for scale in scales:
+        counts = scaled(scale)
+        db_path = args.workdir / f"synth-{scale:g}-seed{args.seed}.sqlite"
+        if not db_path.exists():
+            print(f"Generating scale {scale:g} ({counts['items']:,} items) ...", file=sys.stderr)
+            generate(db_path, counts, args.seed)
+        with closing(sqlite3.connect(db_path)) as conn:
+            (spawns,) = conn.execute("SELECT COUNT(*) FROM item_locations").fetchone()
+        sizes.append(counts["items"])
+        print(f"Benchmarking scale {scale:g}: {counts['items']:,} items, {spawns:,} spawns", file=sys.stderr)
+        for name, times in bench(db_path, args.repeat, args.seed).items():
+            medians.setdefault(name, []).append(statistics.median(times))
+
+    name_w = max(len(n) for n in medians)
+    header = f"{'query':<{name_w}}  " + "  ".join(f"{f'{n:,} items':>14}" for n in sizes) + "  growth"
+    print(header)
+    print("-" * len(header))
+    for name, ms in medians.items():
+        growth = ""
+        if len(sizes) > 1 and ms[0] > 0 and ms[-1] > 0:
+            growth = f"{math.log(ms[-1] / ms[0]) / math.log(sizes[-1] / sizes[0]):6.2f}"
+        print(f"{name:<{name_w}}  " + "  ".join(f"{m:>11.3f} ms" for m in ms) + f"  {growth}")
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,10 @@ import sqlite3, pathlib
 # Path to the SQL schema def. file
 # `pathlib.Path(__file__)` - current file location
 # `.resolve().parents[1]` - go up 2 levels (current -> scripts/ -> project root)
-# `/ "sql" / "schema.sql"` - append path to the schema file
+# `/ "f76" / "sql" / "migrations" / ...` - append path to the baseline schema (first migration)
 # In short: Computing & storing the absolute path to the schema
 # Docs: https://docs.python.org/3/library/pathlib.html
-SCHEMA = pathlib.Path(__file__).resolve().parents[1] / "sql" / "schema.sql"
+SCHEMA = pathlib.Path(__file__).resolve().parents[1] / "f76" / "sql" / "migrations" / "0001_initial_schema.sql"
 
 def ensure_schema(conn: sqlite3.Connection):
     """
@@ -0,0 +1,183 @@
+"""
+Fill a database with synthetic data at whatever size you ask for, to see how f76 behaves
+once the real data grows (more location coverage, history, other games).
+
+    python scripts/synth_dataset.py /tmp/synth.sqlite --items 100000 --scraps 1000000 --spawns 5000000
+
+Every table the CLI reads gets rows: items, components, scrap links, regions, locations, spawns and their descriptions,
+recipes (with their raw-material closure), the yield rollups and a baseline history generation.
+The same --seed always produces the same database.
+"""
+import argparse, pathlib, random, sqlite3, sys, time
+from contextlib import closing
+
+from f76.scripts.db_utils import get_conn
+from f76.scripts.scrape.crafting_recipes import rebuild_recipe_materials
+
+# Full size - `--scale 0.1` gives a tenth of every count except the fixed catalogues
+# (there are only so many components and map regions, however much else grows)
+FIXED = {"components", "regions"}
+FULL = {
+    "items": 100_000,
+    "components": 60,
+    "scraps": 1_000_000,
+    "regions": 10,
+    "locations": 20_000,
+    "spawns": 5_000_000,
+    "recipes": 5_000,
+}
+
+BATCH = 50_000
+COUNT_WORDS = ["One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten"]
+SPOTS = ["on the desk", "in the kitchen", "near the workbench", "on a shelf", "in the basement",
+         "under the stairs", "in a toolbox", "by the generator", "on the counter", "in a locker"]
+
+def _batches(rows, size: int = BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(conn: sqlite3.Connection, sql: str, rows) -> int:
+    n = 0
+    for batch in _batches(rows):
+        conn.executemany(sql, batch)
+        n += len(batch)
+    return n
+
+def _spread(total: int, buckets: int, rng: random.Random, cap: int) -> list[int]:
+    """Split `total` into `buckets` counts between 1 and `cap`, uneven like the real data"""
+    mean = total / buckets
+    return [max(1, min(cap, round(rng.expovariate(1 / mean)))) for _ in range(buckets)]
+
+def generate(db_path: pathlib.Path, counts: dict[str, int], seed: int = 76) -> dict[str, int]:
+    """
+    Write a synthetic dataset to `db_path` (which must not exist yet).
+    Returns row counts per table.
+    """
+    rng = random.Random(seed)
+    if db_path.exists():
+        raise FileExistsError(f"{db_path} already exists")
+
+    with closing(get_conn(db_path)) as conn:
+        # a throwaway database - trade durability for load speed
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        # Per-row triggers (yield rollups, history) would make a multi-million row load crawl.
+        # Drop them for the load, rebuild the derived tables in one pass each, then put them back.
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        for name, _ in triggers:
+            conn.execute(f'DROP TRIGGER "{name}"')
+
+        n_items, n_comps = counts["items"], counts["components"]
+        n_regions, n_locs = counts["regions"], counts["locations"]
+
+        _insert(conn, "INSERT INTO component(id, name) VALUES (?, ?)",
+                ((c, f"Component {c}") for c in range(1, n_comps + 1)))
+        _insert(conn, "INSERT INTO item(id, name, url) VALUES (?, ?, ?)",
+                ((i, f"Junk item {i}", f"https://example.invalid/wiki/Junk_item_{i}") for i in range(1, n_items + 1)))
+
+        # each item scraps into a handful of distinct components
+        per_item = _spread(counts["scraps"], n_items, rng, cap=min(20, n_comps))
+        _insert(conn, "INSERT INTO item_scraps(item_id, component_id, quantity) VALUES (?, ?, ?)",
+                ((i, c, rng.choice((1, 1, 1, 2, 2, 3, 4, 5, 10)))
+                 for i, k in enumerate(per_item, start=1)
+                 for c in rng.sample(range(1, n_comps + 1), k)))
+
+        _insert(conn, "INSERT INTO region(id, name, url) VALUES (?, ?, ?)",
+                ((r, f"Region {r}", None) for r in range(1, n_regions + 1)))
+        _insert(conn, "INSERT INTO location(id, name, region_id, url) VALUES (?, ?, ?, ?)",
+                ((l, f"Location {l}", rng.randint(1, n_regions), f"https://example.invalid/wiki/Location_{l}")
+                 for l in range(1, n_locs + 1)))
+
+        # spawn descriptions, interned up front: "<count> <spot>" -> description id
+        descriptions = {f"{word} {spot}": d for d, (word, spot) in
+                        enumerate(((w, s) for w in COUNT_WORDS for s in SPOTS), start=1)}
+        _insert(conn, "INSERT INTO description(id, text) VALUES (?, ?)", ((d, t) for t, d in descriptions.items()))
+
+        # spawns: a few popular locations get most of them, like real maps
+        def spawns():
+            for i, k in enumerate(_spread(counts["spawns"], n_items, rng, cap=n_locs), start=1):
+                for l in {min(n_locs, int(rng.paretovariate(1.2))) if rng.random() < 0.3 else rng.randint(1, n_locs)
+                          for _ in range(k)}:
+                    q = rng.randint(1, 10)
+                    yield i, l, descriptions[f"{COUNT_WORDS[q - 1]} {rng.choice(SPOTS)}"], q
+        _insert(conn, "INSERT OR IGNORE INTO item_locations(item_id, location_id, description_id, quantity) VALUES (?, ?, ?, ?)",
+                spawns())
+
+        # recipes: mostly components, sometimes an earlier recipe, so the closure has depth
+        n_recipes = counts["recipes"]
+        _insert(conn, "INSERT INTO recipe(id, name, kind, url) VALUES (?, ?, ?, ?)",
+                ((r, f"Recipe {r}", rng.choice(("craft", "mod")), None) for r in range(1, n_recipes + 1)))
+        def ingredients():
+            for r in range(1, n_recipes + 1):
+                names = {f"Recipe {rng.randint(1, r - 1)}" if r > 1 and rng.random() < 0.2
+                         else f"Component {rng.randint(1, n_comps)}" for _ in range(rng.randint(2, 6))}
+                for name in names:
+                    yield r, name, rng.randint(1, 5)
+        _insert(conn, "INSERT INTO recipe_ingredient(recipe_id, ingredient, quantity) VALUES (?, ?, ?)",
+                ingredients())
+        rebuild_recipe_materials(conn)
+
+        # derived tables, same math as the backfills in the migrations
+        conn.execute("""
+            INSERT INTO location_component_yield(component_id, location_id, yield)
+            SELECT s.component_id, il.location_id, SUM(COALESCE(il.quantity, 1) * s.quantity)
+            FROM item_locations il JOIN item_scraps s ON s.item_id = il.item_id
+            GROUP BY s.component_id, il.location_id
+        """)
+        conn.execute("""
+            INSERT INTO region_component_yield(component_id, region_id, yield)
+            SELECT component_id, l.region_id, SUM(y.yield)
+            FROM location_component_yield y JOIN location l ON l.id = y.location_id
+            GROUP BY component_id, l.region_id
+        """)
+        run_id = conn.execute(
+            "INSERT INTO scrape_run(scraper, finished_at, status) VALUES ('synthetic', strftime('%Y-%m-%dT%H:%M:%SZ', 'now'), 'ok')"
+        ).lastrowid
+        conn.execute("INSERT INTO scrap_history(item_id, component_id, run_id, quantity) "
+                     "SELECT item_id, component_id, ?, quantity FROM item_scraps", (run_id,))
+        conn.execute("INSERT INTO location_history(item_id, location_id, description_id, run_id, quantity, present) "
+                     "SELECT item_id, location_id, description_id, ?, quantity, 1 FROM item_locations", (run_id,))
+
+        for _, sql in triggers:
+            conn.execute(sql)
+        conn.commit()
+        conn.execute("ANALYZE")
+
+        tables = [t for (t,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+
+def scaled(scale: float, **overrides: int | None) -> dict[str, int]:
+    """FULL sizes times `scale` (at least 1 of everything), with explicit counts taking precedence"""
+    counts = {k: v if k in FIXED else max(1, round(v * scale)) for k, v in FULL.items()}
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return counts
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Fill a new database with synthetic f76 data")
+    ap.add_argument("db", type=pathlib.Path, help="database file to create")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every full-size count (default 1.0)")
+    for key, full in FULL.items():
+        ap.add_argument(f"--{key}", type=int, help=f"override the {key} count (full size {full:,})")
+    ap.add_argument("--seed", type=int, default=76)
+    args = ap.parse_args(argv)
+
+    counts = scaled(args.scale, **{k: getattr(args, k) for k in FULL})
+    start = time.perf_counter()
+    try:
+        rows = generate(args.db, counts, args.seed)
+    except FileExistsError as e:
+        sys.exit(str(e))
+    print(f"Wrote {args.db} in {time.perf_counter() - start:.1f}s ({args.db.stat().st_size / 1024 / 1024:.1f} MiB)")
+    for table, n in rows.items():
+        print(f"  {table:<26} {n:>12,}")
+
+if __name__ == "__main__":
+    main()
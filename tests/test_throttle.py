@@ -0,0 +1,148 @@
+import threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from f76.scripts.scrape import throttle
+from f76.scripts.scrape.throttle import AdaptiveConcurrency, ThrottledSession, TokenBucket
+
+# A local stand-in for the wiki: each path answers from a script of (status, headers, delay) steps,
+# one per request, repeating the last step once the script runs out.
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.scripts: dict[str, list[tuple[int, dict, float]]] = {}
+        self.hits: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def host(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}"
+
+    def next_step(self, path: str) -> tuple[int, dict, float]:
+        with self.lock:
+            n = self.hits.get(path, 0)
+            self.hits[path] = n + 1
+            script = self.scripts.get(path, [(200, {}, 0.0)])
+            return script[min(n, len(script) - 1)]
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, headers, delay = self.server.next_step(self.path)
+        time.sleep(delay)
+        body = f"{status}".encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # keep pytest output clean
+
+@pytest.fixture(scope="module")
+def server():
+    srv = StubServer()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+@pytest.fixture
+def stub(server, monkeypatch):
+    """The stub server with fresh scripts, a fast token bucket for its host and near-instant backoff"""
+    server.scripts.clear()
+    server.hits.clear()
+    # the default bucket (4/s) would slow every test down
+    monkeypatch.setattr(throttle, "_buckets", {server.host: TokenBucket(rate=1000, burst=1000)})
+    monkeypatch.setattr(throttle, "BACKOFF_BASE", 0.01)
+    return server
+
+@pytest.fixture
+def backoffs(monkeypatch) -> list[int]:
+    """Attempt numbers throttle.backoff was called with"""
+    calls: list[int] = []
+    real = throttle.backoff
+    def spy(attempt: int) -> float:
+        calls.append(attempt)
+        return real(attempt)
+    monkeypatch.setattr(throttle, "backoff", spy)
+    return calls
+
+def test_retries_503_then_succeeds(stub, backoffs):
+    stub.scripts["/flaky"] = [(503, {}, 0.0), (200, {}, 0.0)]
+    resp = ThrottledSession().get(stub.url + "/flaky")
+    assert resp.status_code == 200
+    assert stub.hits["/flaky"] == 2
+    assert backoffs == [0]
+
+def test_429_waits_for_retry_after(stub, backoffs):
+    stub.scripts["/busy"] = [(429, {"Retry-After": "1"}, 0.0), (200, {}, 0.0)]
+    start = time.monotonic()
+    resp = ThrottledSession().get(stub.url + "/busy")
+    assert resp.status_code == 200
+    assert time.monotonic() - start >= 1.0
+    assert stub.hits["/busy"] == 2
+    assert backoffs == []  # the server said how long - no backoff guess
+
+def test_permanent_500_gives_up_after_max_retries(stub, backoffs):
+    stub.scripts["/broken"] = [(500, {}, 0.0)]
+    resp = ThrottledSession(max_retries=2).get(stub.url + "/broken")
+    assert resp.status_code == 500  # handed back like a bare requests.get would
+    assert stub.hits["/broken"] == 3  # first try + 2 retries
+    assert backoffs == [0, 1]
+
+def test_slow_responses_shrink_concurrency_and_healthy_ones_grow_it(stub):
+    stub.scripts["/slow"] = [(200, {}, 0.3)]
+    concurrency = AdaptiveConcurrency(initial=4, minimum=1, maximum=8, latency_target=0.2)
+    session = ThrottledSession(concurrency=concurrency)
+
+    session.get(stub.url + "/slow")
+    assert concurrency.limit == 2
+    session.get(stub.url + "/slow")
+    assert concurrency.limit == 1
+    session.get(stub.url + "/slow")
+    assert concurrency.limit == 1  # never below the minimum
+
+    # +1 per full window of healthy responses: 1 response to reach 2, then 2 more to reach 3
+    for _ in range(3):
+        session.get(stub.url + "/fast")
+    assert concurrency.limit == 3
+
+def test_concurrent_slow_responses_halve_once_per_window(stub):
+    stub.scripts["/slow"] = [(200, {}, 0.3)]
+    concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=8, latency_target=0.2)
+    session = ThrottledSession(concurrency=concurrency)
+
+    # 8 slow requests in flight together are one bad window, not 8 - halve once, not down to the minimum
+    threads = [threading.Thread(target=session.get, args=(stub.url + "/slow",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stub.hits["/slow"] == 8
+    assert concurrency.limit == 4
+
+    # a request sent after that cut is news about a new window
+    session.get(stub.url + "/slow")
+    assert concurrency.limit == 2
+
+def test_token_bucket_caps_request_rate(stub):
+    throttle._buckets[stub.host] = TokenBucket(rate=20, burst=1)
+    session = ThrottledSession()
+    start = time.monotonic()
+    for _ in range(6):
+        session.get(stub.url + "/ok")
+    # the first request spends the burst token, the other 5 wait 1/20 s each
+    assert time.monotonic() - start >= 5 / 20 * 0.95
+    assert stub.hits["/ok"] == 6